@@ -0,0 +1,29 @@
+"""
+Gunicorn configuration for the Lens Search API.
+
+Run with: gunicorn lens_search_api:app (this file is picked up automatically).
+
+Requests spend most of their time waiting on Supabase and embedding APIs, so
+gevent workers keep many of them in flight per process instead of one.
+"""
+import os
+
+# Railway provides PORT env var
+bind = f"0.0.0.0:{os.getenv('PORT', os.getenv('LENS_API_PORT', 5002))}"
+
+# One worker by default: concurrency comes from gevent, not processes. Each
+# worker holds its own lens graph, embedding model, query cache and
+# CACHE_VERSION, so with several workers /api/v1/cache/version differs by
+# worker (clients keep wiping their caches) and /api/v1/cache/clear only
+# reaches the worker that served it. Raise WEB_CONCURRENCY only if that and
+# the extra memory per worker are acceptable.
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+worker_class = 'gevent'
+worker_connections = 500
+
+# Allow slow upstream calls (LLM / embeddings) to finish
+timeout = 120
+graceful_timeout = 30
+
+accesslog = '-'
+errorlog = '-'
@@ -3,20 +3,37 @@
 FLUX Lens Search API - RESTful API for lens exploration
 Updated: 2025-11-21 - Added gap detection endpoints
 """
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
+import re
 from dotenv import load_dotenv
 from supabase_store import SupabaseLensStore
 from datetime import datetime, timedelta
 import json
+import heapq
+import hashlib
 from typing import List, Dict, Optional
-from collections import Counter
+from collections import Counter, OrderedDict, defaultdict
 import numpy as np
+from scipy import sparse
 # OpenAI import removed - embeddings handled by Supabase store
-import hashlib
 from functools import lru_cache
+from itertools import chain
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson  # Faster parsing of the frames catalog when available
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash  # Faster ETag hashing when available
+except ImportError:
+    xxhash = None
 
 load_dotenv()
 
@@ -29,72 +46,113 @@ def increment_cache_version():
     CACHE_VERSION = int(time.time())
     return CACHE_VERSION
 
-# Simple in-memory cache with TTL
+# Simple in-memory cache with TTL, bounded by LRU eviction
 class QueryCache:
-    def __init__(self, ttl_seconds=3600):  # 1 hour default
-        self.cache = {}
+    def __init__(self, ttl_seconds=3600, maxsize=1024):  # 1 hour default
+        self.cache = OrderedDict()  # key -> (result, timestamp), least recently used first
         self.ttl = ttl_seconds
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
     
     def _make_key(self, endpoint, params):
         """Create a cache key from endpoint and parameters"""
-        # Sort params for consistent keys
-        sorted_params = sorted(params.items()) if params else []
-        key_str = f"{endpoint}:{sorted_params}"
-        return hashlib.md5(key_str.encode()).hexdigest()
+        # Sort params for consistent keys; the dict hashes the tuple natively
+        sorted_params = tuple(sorted(params.items())) if params else ()
+        try:
+            hash(sorted_params)
+        except TypeError:
+            # Unhashable values (lists, dicts) are keyed by their repr
+            sorted_params = tuple((k, repr(v)) for k, v in sorted_params)
+        return (endpoint, sorted_params)
     
     def get(self, endpoint, params):
         """Get cached result if valid"""
         key = self._make_key(endpoint, params)
-        if key in self.cache:
-            result, timestamp = self.cache[key]
-            if time.time() - timestamp < self.ttl:
-                return result
-            else:
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                result, timestamp = entry
+                if time.time() - timestamp < self.ttl:
+                    self.cache.move_to_end(key)
+                    self.hits += 1
+                    return result
                 # Expired, remove it
                 del self.cache[key]
+            self.misses += 1
         return None
     
     def set(self, endpoint, params, result):
-        """Cache a result"""
+        """Cache a result, evicting the least recently used entries past maxsize"""
         key = self._make_key(endpoint, params)
-        self.cache[key] = (result, time.time())
+        with self._lock:
+            self.cache[key] = (result, time.time())
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+                self.evictions += 1
     
     def clear(self):
         """Clear all cache"""
-        self.cache.clear()
+        with self._lock:
+            self.cache.clear()
     
     def stats(self):
         """Get cache statistics"""
-        total = len(self.cache)
-        expired = sum(1 for _, (_, ts) in self.cache.items() 
-                     if time.time() - ts >= self.ttl)
-        return {
-            'total_entries': total,
-            'active_entries': total - expired,
-            'expired_entries': expired
-        }
+        now = time.time()
+        with self._lock:
+            total = len(self.cache)
+            # Bounded by maxsize; expired entries are otherwise dropped lazily on get
+            expired = sum(1 for _, ts in self.cache.values() if now - ts >= self.ttl)
+            return {
+                'total_entries': total,
+                'active_entries': total - expired,
+                'expired_entries': expired,
+                'max_entries': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
 
 # Initialize cache with 1 hour TTL
 query_cache = QueryCache(ttl_seconds=3600)
 
+# Shared pool for overlapping independent Supabase requests within a request
+FETCH_POOL = ThreadPoolExecutor(max_workers=8)
+
+# Random generator for sampling suggestion lenses
+sampling_rng = np.random.default_rng()
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes responses with orjson when it is installed."""
+    
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+        # Dates and dataclasses still go through Flask's default() for the same output
+        option = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                  | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
 app = Flask(__name__)
-# Configure CORS to allow requests from your domains
-CORS(app, origins=[
-    "http://localhost:3000",
-    "http://localhost:3001", 
-    "https://interlens.com",  # Your main domain
-    "https://www.interlens.com",  # www subdomain
-    "http://interlens.com",  # HTTP version
-    "http://www.interlens.com",  # HTTP www
-    "https://interlens.vercel.app",  # Your Vercel app
-    "https://interlens-*.vercel.app",  # Vercel preview deployments
-    "https://*.vercel.app",  # Allow all Vercel deployments
-    "https://*.netlify.app",  # Allow Netlify deployments
-    "https://*.surge.sh",  # Allow Surge deployments
-    "https://*.github.io",  # Allow GitHub Pages
-    "https://*.railway.app",  # Allow Railway deployments
-    "https://*.up.railway.app"  # Allow Railway preview deployments
-])
+app.json = OrjsonProvider(app)
+# Configure CORS to allow requests from your domains. One anchored pattern
+# means each request's Origin is tested once rather than against every entry.
+CORS_ORIGIN_PATTERN = re.compile(
+    r'^(?:'
+    r'http://localhost:(?:3000|3001)'
+    r'|https?://(?:www\.)?interlens\.com'  # Main domain and www, HTTP and HTTPS
+    r'|https://[^/:]+\.(?:vercel\.app|netlify\.app|surge\.sh|github\.io|railway\.app)'  # Vercel, Netlify, Surge, GitHub Pages, Railway deployments
+    r')$',
+    re.IGNORECASE,
+)
+CORS(app, origins=CORS_ORIGIN_PATTERN)
 
 # Initialize Supabase store
 supabase_store = SupabaseLensStore()
@@ -109,23 +167,68 @@ try:
 except Exception as e:
     print(f"Failed to load AI connections: {e}")
 
+# Lens id -> its AI connections, each connection listed from both ends
+lens_connections = defaultdict(list)
+for conn in AI_CONNECTIONS:
+    shared = {'type': conn['type'], 'weight': conn['weight'], 'insight': conn['insight']}
+    lens_connections[conn['source_id']].append(
+        {'target_id': conn['target_id'], 'target_name': conn.get('target_name', ''), **shared})
+    lens_connections[conn['target_id']].append(
+        {'target_id': conn['source_id'], 'target_name': conn.get('source_name', ''), **shared})
+LENS_CONNECTIONS = dict(lens_connections)  # Plain dict: lookups of unconnected lenses must not insert
+
 # Load thematic frames
 FRAMES = []
 LENS_TO_FRAMES = {}  # Map of lens_id to list of frame_ids
 try:
-    with open('lens_frames_thematic.json', 'r') as f:
-        data = json.load(f)
-        FRAMES = data.get('frames', [])
-        # Build reverse mapping
-        for frame in FRAMES:
-            for lens_id in frame.get('lens_ids', []):
-                if lens_id not in LENS_TO_FRAMES:
-                    LENS_TO_FRAMES[lens_id] = []
-                LENS_TO_FRAMES[lens_id].append(frame['id'])
-        print(f"Loaded {len(FRAMES)} thematic frames")
+    with open('lens_frames_thematic.json', 'rb') as f:
+        raw = f.read()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    FRAMES = data.get('frames', [])
+    # Build reverse mapping
+    lens_to_frames = defaultdict(list)
+    for frame in FRAMES:
+        for lens_id in frame.get('lens_ids', []):
+            lens_to_frames[lens_id].append(frame['id'])
+    LENS_TO_FRAMES = dict(lens_to_frames)  # Plain dict: lookups of unknown lenses must not insert
+    print(f"Loaded {len(FRAMES)} thematic frames")
 except Exception as e:
     print(f"Failed to load frames: {e}")
 
+# Frame id -> frame and display name (first frame wins on duplicate ids), and all names in file order
+FRAME_BY_ID = {}
+FRAME_ID_TO_NAME = {}
+for frame in FRAMES:
+    FRAME_BY_ID.setdefault(frame['id'], frame)
+    FRAME_ID_TO_NAME.setdefault(frame['id'], frame.get('name', frame['id']))
+ALL_FRAME_NAMES = tuple(frame.get('name', frame['id']) for frame in FRAMES)
+
+# Basic info for every frame, as listed by /api/v1/frames
+FRAME_SUMMARIES = [
+    {
+        'id': frame['id'],
+        'name': frame.get('name'),
+        'description': frame.get('description'),
+        'lens_count': len(frame.get('lens_ids', [])),
+        'insights': frame.get('insights', ''),
+        'applications': frame.get('applications', []),
+        'metaphor': frame.get('metaphor', '')
+    }
+    for frame in FRAMES
+]
+
+# Frame name -> ids of its lenses (each once, in file order), for sampling lenses from a frame
+frame_name_to_lens_ids = defaultdict(dict)
+for frame in FRAMES:
+    frame_name_to_lens_ids[frame.get('name', frame['id'])].update(dict.fromkeys(frame.get('lens_ids', [])))
+FRAME_NAME_TO_LENS_IDS = {name: tuple(lens_ids) for name, lens_ids in frame_name_to_lens_ids.items()}
+
+# Lens id -> names of the frames it belongs to, so gap biasing needn't convert ids per request
+LENS_ID_TO_FRAME_NAMES = {
+    lens_id: frozenset(FRAME_ID_TO_NAME.get(frame_id, frame_id) for frame_id in frame_ids)
+    for lens_id, frame_ids in LENS_TO_FRAMES.items()
+}
+
 
 # ============================================================================
 # Gap Detection Helper Functions
@@ -133,15 +236,12 @@ except Exception as e:
 
 def get_frame_name_from_id(frame_id: str) -> str:
     """Convert frame_id to human-readable frame name."""
-    for frame in FRAMES:
-        if frame['id'] == frame_id:
-            return frame.get('name', frame_id)
-    return frame_id  # Fallback to ID if name not found
+    return FRAME_ID_TO_NAME.get(frame_id, frame_id)  # Fallback to ID if name not found
 
 
 def get_all_frame_names() -> List[str]:
     """Get list of all frame names."""
-    return [frame.get('name', frame['id']) for frame in FRAMES]
+    return list(ALL_FRAME_NAMES)
 
 
 def calculate_frame_coverage(context_lens_names: List[str]) -> Dict:
@@ -163,11 +263,11 @@ def calculate_frame_coverage(context_lens_names: List[str]) -> Dict:
         lens_frame_map = supabase_store.get_frame_ids_for_lenses(context_lens_names, LENS_TO_FRAMES)
 
         # Count frame usage (converting frame_ids to names)
-        explored_frames = {}
-        for lens, frame_ids in lens_frame_map.items():
-            for frame_id in frame_ids:
-                frame_name = get_frame_name_from_id(frame_id)
-                explored_frames[frame_name] = explored_frames.get(frame_name, 0) + 1
+        explored_frames = Counter(
+            get_frame_name_from_id(frame_id)
+            for frame_ids in lens_frame_map.values()
+            for frame_id in frame_ids
+        )
 
         # Categorize frames
         unexplored = [f for f in all_frame_names if f not in explored_frames]
@@ -207,36 +307,33 @@ def bias_lens_selection(all_lenses: List[Dict], coverage_data: Dict) -> Optional
     if not all_lenses:
         return None
 
-    # Categorize lenses by frame coverage (convert frame_ids to names for comparison)
+    # Categorize lenses by frame coverage (compared by frame name).
+    # The coverage lists stay lists for the response; sets make each probe O(1).
+    unexplored_frames = frozenset(coverage_data['unexplored'])
+    underexplored_frames = frozenset(coverage_data['underexplored'])
     unexplored_lenses = []
     underexplored_lenses = []
 
     for lens in all_lenses:
-        lens_frame_ids = lens.get('frame_ids', [])
-        # Handle frame_ids as string or list
-        if isinstance(lens_frame_ids, str):
-            lens_frame_ids = [lens_frame_ids]
-        elif not isinstance(lens_frame_ids, list):
-            lens_frame_ids = []
-
-        # Convert frame_ids to frame_names
-        lens_frame_names = [get_frame_name_from_id(fid) for fid in lens_frame_ids]
+        # frame_ids is not in Supabase; frame membership comes from lens_frames_thematic.json
+        lens_frame_names = LENS_ID_TO_FRAME_NAMES.get(lens.get('id'), frozenset())
 
         # Check if lens belongs to unexplored or underexplored frames
-        if any(f in coverage_data['unexplored'] for f in lens_frame_names):
+        if not unexplored_frames.isdisjoint(lens_frame_names):
             unexplored_lenses.append(lens)
-        elif any(f in coverage_data['underexplored'] for f in lens_frame_names):
+        elif not underexplored_frames.isdisjoint(lens_frame_names):
             underexplored_lenses.append(lens)
 
-    # Apply weighted random selection (80/15/5)
-    rand = random.random()
-
-    if rand < 0.80 and unexplored_lenses:
-        return random.choice(unexplored_lenses)
-    elif rand < 0.95 and underexplored_lenses:
-        return random.choice(underexplored_lenses)
-    else:
-        return random.choice(all_lenses)
+    # Apply weighted random selection (80/15/5) over the non-empty categories;
+    # random.choices renormalizes the weights of whichever remain
+    categories = [
+        (lenses, weight)
+        for lenses, weight in ((unexplored_lenses, 0.80), (underexplored_lenses, 0.15), (all_lenses, 0.05))
+        if lenses
+    ]
+    pool = random.choices([lenses for lenses, _ in categories],
+                          weights=[weight for _, weight in categories])[0]
+    return random.choice(pool)
 
 
 def generate_gap_report(coverage_data: Dict, selected_lens: Dict) -> Dict:
@@ -250,18 +347,17 @@ def generate_gap_report(coverage_data: Dict, selected_lens: Dict) -> Dict:
     Returns:
         Gap analysis dictionary for response
     """
-    # Get frame_ids of selected lens and convert to names
-    lens_frame_ids = selected_lens.get('frame_ids', [])
-    if isinstance(lens_frame_ids, str):
-        lens_frame_ids = [lens_frame_ids]
-    elif not isinstance(lens_frame_ids, list):
-        lens_frame_ids = []
-
-    lens_frame_names = [get_frame_name_from_id(fid) for fid in lens_frame_ids]
-    lens_frame = lens_frame_names[0] if lens_frame_names else 'Unknown'
-
-    # Determine if suggestion was gap-biased
-    was_gap_biased = lens_frame in coverage_data['unexplored']
+    # Frames of the selected lens, looked up the same way bias_lens_selection does
+    # (frame_ids is not in Supabase; membership comes from lens_frames_thematic.json)
+    lens_frame_names = LENS_ID_TO_FRAME_NAMES.get(selected_lens.get('id'), frozenset())
+
+    # Determine if suggestion was gap-biased, reporting the unexplored frame it came from
+    gap_frames = [f for f in coverage_data['unexplored'] if f in lens_frame_names]
+    was_gap_biased = bool(gap_frames)
+    if gap_frames:
+        lens_frame = gap_frames[0]
+    else:
+        lens_frame = next((f for f in ALL_FRAME_NAMES if f in lens_frame_names), 'Unknown')
 
     return {
         'explored_frames': list(coverage_data['explored'].keys()),
@@ -276,6 +372,49 @@ def generate_gap_report(coverage_data: Dict, selected_lens: Dict) -> Dict:
     }
 
 
+def get_all_lens_rows() -> List[Dict]:
+    """
+    Get the full lens catalog from Supabase, shared across endpoints.
+
+    Cached like an endpoint result (cleared with the cache), so the
+    endpoints reading the catalog fetch it once per cache window between
+    them. Rows carry LENS_LIST_COLUMNS only, not the embeddings; callers
+    must not modify them.
+    """
+    all_lenses = query_cache.get('all_lens_rows', {})
+    if all_lenses is None:
+        all_lenses = supabase_store.get_lenses_filtered(limit=500)
+        # An empty result is how a failed fetch looks; don't keep it for the TTL
+        if all_lenses:
+            query_cache.set('all_lens_rows', {}, all_lenses)
+    return all_lenses
+
+
+def parallel_fetch(*calls):
+    """
+    Run independent zero-argument calls (Supabase round trips) concurrently.
+
+    Returns their results in the order the calls were given.
+    """
+    futures = [FETCH_POOL.submit(call) for call in calls]
+    return [future.result() for future in futures]
+
+
+def episode_sort_key(lens: Dict) -> int:
+    """Sort key for formatted lenses by episode, lenses without one first."""
+    return int(lens['episode']) if lens['episode'] else 0
+
+
+def normalize_episode_param(episode: Optional[str]):
+    """Episode query arg as an int when numeric, None when blank, else unchanged."""
+    if not episode:
+        return None
+    try:
+        return int(episode)
+    except ValueError:
+        return episode
+
+
 # ============================================================================
 # API Routes
 # ============================================================================
@@ -288,6 +427,14 @@ def get_lenses():
     frame_id = request.args.get('frame')  # filter by frame
     limit = int(request.args.get('limit', 500))
     
+    # Normalize filters so equivalent requests share a cache entry: blank or
+    # no-op filters become None, and numeric episodes ints ('7' == '07')
+    if lens_type in ('', 'all'):
+        lens_type = None
+    episode = normalize_episode_param(episode)
+    if frame_id not in FRAME_BY_ID:
+        frame_id = None  # Unknown frames don't filter
+    
     # Try cache first
     cache_params = {
         'lens_type': lens_type,
@@ -299,52 +446,20 @@ def get_lenses():
     if cached_result:
         return jsonify(cached_result)
     
-    # Get all lenses from Supabase with limit
-    all_lenses = supabase_store.get_all_lenses(limit=limit)
-    
-    # Apply filters
-    filtered_lenses = []
-    for lens in all_lenses:
-        # Filter by lens type
-        if lens_type and lens_type != 'all' and lens.get('lens_type') != lens_type:
-            continue
-        # Filter by episode
-        if episode and str(lens.get('episode')) != str(episode):
-            continue
-        # Filter by frame
-        if frame_id:
-            frame = next((f for f in FRAMES if f['id'] == frame_id), None)
-            if frame and lens['id'] not in frame.get('lens_ids', []):
-                continue
-        filtered_lenses.append(lens)
-    
-    lenses = []
-    lens_connections = {}
-    
-    # Build connection map from AI discoveries
-    for conn in AI_CONNECTIONS:
-        if conn['source_id'] not in lens_connections:
-            lens_connections[conn['source_id']] = []
-        if conn['target_id'] not in lens_connections:
-            lens_connections[conn['target_id']] = []
-        
-        lens_connections[conn['source_id']].append({
-            'target_id': conn['target_id'],
-            'target_name': conn.get('target_name', ''),
-            'type': conn['type'],
-            'weight': conn['weight'],
-            'insight': conn['insight']
-        })
-        lens_connections[conn['target_id']].append({
-            'target_id': conn['source_id'],
-            'target_name': conn.get('source_name', ''),
-            'type': conn['type'],
-            'weight': conn['weight'],
-            'insight': conn['insight']
-        })
+    # Filter in Supabase; a frame filter becomes a filter on its lens ids
+    frame_lens_ids = FRAME_BY_ID[frame_id].get('lens_ids', []) if frame_id else None
+    filtered_lenses = supabase_store.get_lenses_filtered(
+        lens_type=lens_type,
+        episode=episode,
+        ids=frame_lens_ids,
+        limit=limit
+    )
     
-    for lens in filtered_lenses:
-        lenses.append({
+    # Lookups bound once for the projection below
+    connections_for = LENS_CONNECTIONS.get
+    frames_for = LENS_TO_FRAMES.get
+    lenses = [
+        {
             'id': lens['id'],
             'episode': lens.get('episode'),
             'lens_type': lens.get('lens_type'),
@@ -354,12 +469,14 @@ def get_lenses():
             'related_concepts': lens.get('related_concepts', []),
             'source_url': lens.get('source_url'),
             'extracted_at': lens.get('extracted_at'),
-            'ai_connections': lens_connections.get(lens['id'], []),
-            'frame_ids': LENS_TO_FRAMES.get(lens['id'], [])
-        })
+            'ai_connections': connections_for(lens['id'], []),
+            'frame_ids': frames_for(lens['id'], [])
+        }
+        for lens in filtered_lenses
+    ]
     
     # Sort by episode
-    lenses.sort(key=lambda x: int(x['episode']) if x['episode'] else 0)
+    lenses.sort(key=episode_sort_key)
     
     result = {
         'success': True,
@@ -375,7 +492,7 @@ def get_lenses():
 @app.route('/api/v1/lenses/search', methods=['GET'])
 def search_lenses():
     """Search lenses by semantic similarity using embeddings"""
-    query = request.args.get('q', '')
+    query = ' '.join(request.args.get('q', '').split())  # Whitespace doesn't change the embedding
     if not query:
         return jsonify({'success': False, 'error': 'Query parameter required'}), 400
 
@@ -389,9 +506,8 @@ def search_lenses():
     search_results = supabase_store.search_lenses(query, k=20)
 
     # Format results for consistent API response
-    formatted_results = []
-    for lens in search_results:
-        formatted_results.append({
+    formatted_results = [
+        {
             'id': lens['id'],
             'episode': lens.get('episode'),
             'lens_type': lens.get('lens_type'),
@@ -401,7 +517,9 @@ def search_lenses():
             'related_concepts': lens.get('related_concepts', []),
             'similarity': lens.get('similarity', 0),
             'relevance_score': lens.get('similarity', 0) * 10  # Scale for backwards compatibility
-        })
+        }
+        for lens in search_results
+    ]
 
     result = {
         'success': True,
@@ -426,12 +544,13 @@ def get_statistics():
     
     # Get statistics from Supabase
     stats = supabase_store.get_stats()
-    all_lenses = supabase_store.get_all_lenses(limit=500)
+    all_lenses = get_all_lens_rows()
     
     # Calculate detailed statistics
     total_lenses = len(all_lenses)
-    headline_count = sum(1 for lens in all_lenses if lens.get('lens_type') == 'headline')
-    weekly_count = sum(1 for lens in all_lenses if lens.get('lens_type') == 'weekly')
+    type_counts = Counter(lens.get('lens_type') for lens in all_lenses)
+    headline_count = type_counts['headline']
+    weekly_count = type_counts['weekly']
     
     # Episode coverage
     episodes = set()
@@ -447,11 +566,9 @@ def get_statistics():
     episodes_with_both = sum(1 for types in episode_types.values() if len(types) == 2)
     
     # Concept frequency (now using consolidated tags)
-    all_concepts = []
-    for lens in all_lenses:
-        all_concepts.extend(lens.get('related_concepts', []))
-    
-    concept_counts = Counter(all_concepts).most_common(20)
+    concept_counts = Counter(
+        chain.from_iterable(lens.get('related_concepts') or () for lens in all_lenses)
+    ).most_common(20)
     
     result = {
         'success': True,
@@ -475,17 +592,9 @@ def get_statistics():
 @app.route('/api/v1/lenses/episodes/<int:episode_num>', methods=['GET'])
 def get_episode_lenses(episode_num):
     """Get all lenses from a specific episode"""
-    results = index.query(
-        vector=[0.0] * 384,
-        top_k=10,
-        include_metadata=True,
-        filter={
-            'type': 'lens',
-            'episode': str(episode_num)
-        }
-    )
+    episode_lenses = supabase_store.get_lenses_by_episode(episode_num)
     
-    if not results.matches:
+    if not episode_lenses:
         return jsonify({
             'success': True,
             'episode': episode_num,
@@ -493,17 +602,16 @@ def get_episode_lenses(episode_num):
         })
     
     lenses = []
-    for match in results.matches:
-        meta = match.metadata
+    for lens in episode_lenses:
         lenses.append({
-            'id': match.id,
-            'lens_type': meta.get('lens_type'),
-            'lens_name': meta.get('lens_name'),
-            'definition': meta.get('definition'),
-            'examples': meta.get('examples', []),
-            'related_concepts': meta.get('related_concepts', []),
-            'source_url': meta.get('source_url'),
-            'frame_ids': LENS_TO_FRAMES.get(match.id, [])
+            'id': lens['id'],
+            'lens_type': lens.get('lens_type'),
+            'lens_name': lens.get('name'),  # Note: 'name' not 'lens_name' in Supabase
+            'definition': lens.get('definition'),
+            'examples': lens.get('examples', []),
+            'related_concepts': lens.get('related_concepts', []),
+            'source_url': lens.get('source_url'),
+            'frame_ids': LENS_TO_FRAMES.get(lens['id'], [])
         })
     
     # Sort headline first, then weekly
@@ -524,24 +632,18 @@ def get_concepts():
     if cached_result:
         return jsonify(cached_result)
     
-    results = index.query(
-        vector=[0.0] * 384,
-        top_k=256,  # We only have ~256 lenses total
-        include_metadata=True,
-        filter={'type': 'lens'}
-    )
+    all_lenses = get_all_lens_rows()
     
     # Collect all concepts
     concept_lenses = {}
-    for match in results.matches:
-        meta = match.metadata
-        for concept in meta.get('related_concepts', []):
+    for lens in all_lenses:
+        for concept in lens.get('related_concepts') or []:
             if concept not in concept_lenses:
                 concept_lenses[concept] = []
             concept_lenses[concept].append({
-                'episode': meta.get('episode'),
-                'lens_name': meta.get('lens_name'),
-                'lens_type': meta.get('lens_type')
+                'episode': lens.get('episode'),
+                'lens_name': lens.get('name'),
+                'lens_type': lens.get('lens_type')
             })
     
     # Format response
@@ -575,18 +677,12 @@ def get_timeline():
     if cached_result:
         return jsonify(cached_result)
     
-    results = index.query(
-        vector=[0.0] * 384,
-        top_k=256,  # We only have ~256 lenses total
-        include_metadata=True,
-        filter={'type': 'lens'}
-    )
+    all_lenses = get_all_lens_rows()
     
     # Organize by episode
     timeline = {}
-    for match in results.matches:
-        meta = match.metadata
-        episode = meta.get('episode')
+    for lens in all_lenses:
+        episode = lens.get('episode')
         if episode:
             if episode not in timeline:
                 timeline[episode] = {
@@ -595,11 +691,11 @@ def get_timeline():
                     'weekly': None
                 }
             
-            lens_type = meta.get('lens_type')
+            lens_type = lens.get('lens_type')
             if lens_type == 'headline':
-                timeline[episode]['headline'] = meta.get('lens_name')
+                timeline[episode]['headline'] = lens.get('name')
             elif lens_type == 'weekly':
-                timeline[episode]['weekly'] = meta.get('lens_name')
+                timeline[episode]['weekly'] = lens.get('name')
     
     # Convert to list and sort
     timeline_list = list(timeline.values())
@@ -623,16 +719,10 @@ def get_graph_data():
     if cached_result:
         return jsonify(cached_result)
     
-    results = index.query(
-        vector=[0.0] * 384,
-        top_k=256,  # We only have ~256 lenses total
-        include_metadata=True,
-        filter={'type': 'lens'}
-    )
+    all_lenses = get_all_lens_rows()
     
     # Build nodes
     nodes = []
-    lens_by_id = {}
     concept_map = {}  # Track which lenses share concepts
     
     for lens in all_lenses:
@@ -645,10 +735,9 @@ def get_graph_data():
             'concepts': lens.get('related_concepts', [])
         }
         nodes.append(node)
-        lens_by_id[lens['id']] = node
         
-        # Track concept associations
-        for concept in lens.get('related_concepts', []):
+        # Track concept associations (a concept listed twice counts once)
+        for concept in dict.fromkeys(lens.get('related_concepts', [])):
             if concept not in concept_map:
                 concept_map[concept] = []
             concept_map[concept].append(lens['id'])
@@ -657,27 +746,25 @@ def get_graph_data():
     links = []
     processed_pairs = set()
     
-    # Links based on shared concepts
+    # Links based on shared concepts. Each pair's shared concepts are gathered
+    # in one walk over the concept map rather than by intersecting both
+    # lenses' concept sets per pair; links keep the order pairs are first seen.
+    concept_links = {}  # pair -> (link, shared concepts as an ordered set)
     for concept, lens_ids in concept_map.items():
-        if len(lens_ids) > 1:
-            # Create links between all lenses sharing this concept
-            for i, id1 in enumerate(lens_ids):
-                for id2 in lens_ids[i+1:]:
-                    pair = tuple(sorted([id1, id2]))
-                    if pair not in processed_pairs:
-                        processed_pairs.add(pair)
-                        
-                        # Calculate weight based on number of shared concepts
-                        shared_concepts = set(lens_by_id[id1]['concepts']) & set(lens_by_id[id2]['concepts'])
-                        weight = min(len(shared_concepts) * 0.2, 1.0)
-                        
-                        links.append({
-                            'source': id1,
-                            'target': id2,
-                            'weight': weight,
-                            'type': 'concept',
-                            'shared_concepts': list(shared_concepts)
-                        })
+        for i, id1 in enumerate(lens_ids):
+            for id2 in lens_ids[i+1:]:
+                pair = (id1, id2) if id1 < id2 else (id2, id1)
+                entry = concept_links.get(pair)
+                if entry is None:
+                    entry = concept_links[pair] = ({'source': id1, 'target': id2, 'type': 'concept'}, {})
+                entry[1][concept] = None
+    
+    for pair, (link, shared_concepts) in concept_links.items():
+        processed_pairs.add(pair)
+        # Calculate weight based on number of shared concepts
+        link['weight'] = min(len(shared_concepts) * 0.2, 1.0)
+        link['shared_concepts'] = list(shared_concepts)
+        links.append(link)
     
     # Links based on same episode
     episode_map = {}
@@ -691,7 +778,7 @@ def get_graph_data():
         if len(lens_ids) > 1:
             for i, id1 in enumerate(lens_ids):
                 for id2 in lens_ids[i+1:]:
-                    pair = tuple(sorted([id1, id2]))
+                    pair = (id1, id2) if id1 < id2 else (id2, id1)
                     if pair not in processed_pairs:
                         processed_pairs.add(pair)
                         links.append({
@@ -702,30 +789,36 @@ def get_graph_data():
                             'episode': episode
                         })
     
-    # Links based on sequential episodes (weaker connection)
+    # Links based on sequential episodes (weaker connection). Only nodes from
+    # the adjacent episodes are visited, still in node order.
+    episode_positions = {}
+    for position, node in enumerate(nodes):
+        episode_positions.setdefault(node['episode'], []).append(position)
+    
     for node in nodes:
         current_ep = node['episode']
-        for other_node in nodes:
-            if other_node['episode'] == current_ep + 1 or other_node['episode'] == current_ep - 1:
-                pair = tuple(sorted([node['id'], other_node['id']]))
-                if pair not in processed_pairs:
-                    processed_pairs.add(pair)
-                    links.append({
-                        'source': node['id'],
-                        'target': other_node['id'],
-                        'weight': 0.1,
-                        'type': 'sequential'
-                    })
+        for position in heapq.merge(episode_positions.get(current_ep - 1, ()),
+                                    episode_positions.get(current_ep + 1, ())):
+            other_node = nodes[position]
+            id1, id2 = node['id'], other_node['id']
+            pair = (id1, id2) if id1 < id2 else (id2, id1)
+            if pair not in processed_pairs:
+                processed_pairs.add(pair)
+                links.append({
+                    'source': id1,
+                    'target': id2,
+                    'weight': 0.1,
+                    'type': 'sequential'
+                })
     
     # Calculate node sizes based on connection count
-    connection_count = {}
-    for link in links:
-        connection_count[link['source']] = connection_count.get(link['source'], 0) + 1
-        connection_count[link['target']] = connection_count.get(link['target'], 0) + 1
+    connection_count = Counter(link['source'] for link in links)
+    connection_count.update(link['target'] for link in links)
     
     for node in nodes:
-        node['connectionCount'] = connection_count.get(node['id'], 0)
-        node['radius'] = 5 + min(node['connectionCount'] * 2, 20)
+        count = connection_count[node['id']]
+        node['connectionCount'] = count
+        node['radius'] = 5 + min(count * 2, 20)
     
     result = {
         'success': True,
@@ -795,16 +888,17 @@ def get_semantic_graph():
     links = []
     processed_pairs = set()
     
-    # For each lens, get related lenses (which gives us semantic similarity)
-    for node in nodes[:100]:  # Limit to prevent too many API calls
+    # For each lens, get related lenses based on tags (semantic similarity),
+    # fetched concurrently
+    source_nodes = nodes[:100]  # Limit to prevent too many API calls
+    related_by_node = supabase_store.get_related_lenses_bulk([node['id'] for node in source_nodes], k=10)
+    
+    for node, related in zip(source_nodes, related_by_node):
         id1 = node['id']
         
-        # Get related lenses based on tags (semantic similarity)
-        related = supabase_store.get_related_lenses(id1, k=10)
-        
         for i, related_lens in enumerate(related):
             id2 = related_lens['id']
-            pair = tuple(sorted([id1, id2]))
+            pair = (id1, id2) if id1 < id2 else (id2, id1)
             
             if pair not in processed_pairs:
                 processed_pairs.add(pair)
@@ -897,41 +991,33 @@ def get_frames_semantic_graph():
     
     # Generate embeddings for frames using Supabase store
     try:
-        embeddings = {}
-        for i, frame_text in enumerate(frame_texts):
-            embedding = supabase_store.generate_embedding(frame_text)
-            embeddings[nodes[i]['id']] = embedding
+        embeddings = supabase_store.generate_embeddings_batch(frame_texts)
     except Exception as e:
         print(f"Error generating frame embeddings: {e}")
         return jsonify({'success': False, 'error': 'Failed to generate embeddings'}), 500
     
+    # Cosine similarity of every pair of frames in one matrix product
+    matrix = np.asarray(embeddings, dtype=np.float64)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    similarity_matrix = matrix @ matrix.T
+    
     # Calculate similarities
     links = []
     processed_pairs = set()
     
     for i, node1 in enumerate(nodes):
         id1 = node1['id']
-        embedding1 = np.array(embeddings[id1])
         
-        similarities = []
-        
-        for j, node2 in enumerate(nodes):
-            if i >= j:  # Skip self and already processed pairs
-                continue
-                
-            id2 = node2['id']
-            embedding2 = np.array(embeddings[id2])
-            
-            # Cosine similarity
-            similarity = np.dot(embedding1, embedding2) / (np.linalg.norm(embedding1) * np.linalg.norm(embedding2))
-            
-            if similarity >= min_similarity:
-                similarities.append((id2, similarity))
+        # Candidates are the later frames (each pair is considered once) above the threshold
+        row = similarity_matrix[i, i + 1:]
+        candidates = np.flatnonzero(row >= min_similarity)
+        candidates = candidates[np.argsort(-row[candidates], kind='stable')]
         
         # Add top connections
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        for id2, similarity in similarities[:3]:  # Top 3 connections per frame
-            pair = tuple(sorted([id1, id2]))
+        for j in candidates[:3]:  # Top 3 connections per frame
+            id2 = nodes[i + 1 + j]['id']
+            similarity = row[j]
+            pair = (id1, id2) if id1 < id2 else (id2, id1)
             if pair not in processed_pairs:
                 processed_pairs.add(pair)
                 
@@ -968,7 +1054,7 @@ def get_tags_semantic_graph():
     max_nodes = int(request.args.get('max_nodes', 50))  # Maximum tags to display
     
     # Get all lenses to build tag co-occurrence
-    all_lenses = supabase_store.get_all_lenses(limit=500)
+    all_lenses = get_all_lens_rows()
     
     # Build tag data
     tag_lenses = {}  # tag -> list of lens IDs
@@ -1008,33 +1094,43 @@ def get_tags_semantic_graph():
             'radius': 5 + min(len(top_tags[tag]) * 0.8, 15)
         })
     
-    # Calculate tag similarity based on lens overlap (Jaccard similarity)
+    # Calculate tag similarity based on lens overlap (Jaccard similarity), for
+    # every pair at once from a tag x lens incidence matrix. Each tag touches
+    # only a few lenses, so the incidence is sparse; only the tag x tag
+    # co-occurrence counts (at most max_nodes squared) are made dense
     links = []
     
-    for i, tag1 in enumerate(tag_list):
-        lenses1 = set(top_tags[tag1])
+    lens_columns = {}
+    rows, cols = [], []
+    for i, tag in enumerate(tag_list):
+        for lens_id in dict.fromkeys(top_tags[tag]):
+            rows.append(i)
+            cols.append(lens_columns.setdefault(lens_id, len(lens_columns)))
+    incidence = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(len(tag_list), len(lens_columns))
+    )
+    
+    intersections = (incidence @ incidence.T).toarray()
+    sizes = np.diag(intersections)
+    unions = sizes[:, None] + sizes[None, :] - intersections  # Every tag has a lens, so never 0
+    similarities = intersections / unions
+    
+    # Upper triangle in row order, the same pair order as a nested loop
+    rows, cols = np.triu_indices(len(tag_list), k=1)
+    keep = similarities[rows, cols] >= min_similarity
+    
+    for i, j in zip(rows[keep].tolist(), cols[keep].tolist()):
+        similarity = float(similarities[i, j])
+        link_type = 'strong' if similarity >= 0.6 else 'medium' if similarity >= 0.4 else 'weak'
         
-        for j, tag2 in enumerate(tag_list[i+1:], i+1):
-            lenses2 = set(top_tags[tag2])
-            
-            # Jaccard similarity
-            intersection = len(lenses1 & lenses2)
-            union = len(lenses1 | lenses2)
-            
-            if union > 0:
-                similarity = intersection / union
-                
-                if similarity >= min_similarity:
-                    link_type = 'strong' if similarity >= 0.6 else 'medium' if similarity >= 0.4 else 'weak'
-                    
-                    links.append({
-                        'source': tag1,
-                        'target': tag2,
-                        'weight': float(similarity),
-                        'type': link_type,
-                        'similarity': round(float(similarity), 3),
-                        'shared_lenses': intersection
-                    })
+        links.append({
+            'source': tag_list[i],
+            'target': tag_list[j],
+            'weight': similarity,
+            'type': link_type,
+            'similarity': round(similarity, 3),
+            'shared_lenses': int(intersections[i, j])
+        })
     
     return jsonify({
         'success': True,
@@ -1054,11 +1150,11 @@ def export_lenses():
     """Export lenses in various formats"""
     format_type = request.args.get('format', 'json')  # json, csv, markdown
     
-    all_lenses = supabase_store.get_all_lenses(limit=500)
+    all_lenses = get_all_lens_rows()
     
-    lenses = []
-    for lens in all_lenses:
-        lenses.append({
+    frames_for = LENS_TO_FRAMES.get
+    lenses = [
+        {
             'id': lens['id'],
             'episode': lens.get('episode'),
             'lens_type': lens.get('lens_type'),
@@ -1067,32 +1163,46 @@ def export_lenses():
             'examples': lens.get('examples', []),
             'related_concepts': lens.get('related_concepts', []),
             'source_url': lens.get('source_url'),
-            'frame_ids': LENS_TO_FRAMES.get(match.id, [])
-        })
+            'frame_ids': frames_for(lens['id'], [])
+        }
+        for lens in all_lenses
+    ]
     
     # Sort by episode
-    lenses.sort(key=lambda x: int(x['episode']) if x['episode'] else 0)
+    lenses.sort(key=episode_sort_key)
     
     if format_type == 'csv':
         import csv
         import io
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=[
+        fieldnames = [
             'episode', 'lens_type', 'lens_name', 'definition', 
             'examples', 'related_concepts', 'source_url'
-        ])
-        writer.writeheader()
+        ]
         
-        for lens in lenses:
-            lens_copy = lens.copy()
-            lens_copy['examples'] = ' | '.join(lens['examples'])
-            lens_copy['related_concepts'] = ', '.join(lens['related_concepts'])
-            writer.writerow(lens_copy)
+        def generate_rows():
+            # Stream row by row through one small buffer instead of building the whole file
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore')
+            
+            def flush():
+                chunk = buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                return chunk
+            
+            writer.writeheader()
+            yield flush()
+            for lens in lenses:
+                lens_copy = lens.copy()
+                lens_copy['examples'] = ' | '.join(lens['examples'])
+                lens_copy['related_concepts'] = ', '.join(lens['related_concepts'])
+                writer.writerow(lens_copy)
+                yield flush()
         
-        return output.getvalue(), 200, {
+        return Response(stream_with_context(generate_rows()), 200, {
             'Content-Type': 'text/csv',
             'Content-Disposition': 'attachment; filename=flux_lenses.csv'
-        }
+        })
     
     elif format_type == 'markdown':
         md_content = "# FLUX Lenses\n\n"
@@ -1135,31 +1245,29 @@ def get_frames():
     
     if frame_id:
         # Get specific frame
-        frame = next((f for f in FRAMES if f['id'] == frame_id), None)
+        frame = FRAME_BY_ID.get(frame_id)
         if not frame:
             return jsonify({
                 'success': False,
                 'error': 'Frame not found'
             }), 404
         
-        # Get lens details for this frame
+        # Get lens details for this frame in one query, keeping the frame's order
+        lens_ids = frame.get('lens_ids', [])
+        lens_map = supabase_store.get_lenses_by_ids(lens_ids)
         frame_lenses = []
-        for lens_id in frame.get('lens_ids', []):
-            # Get lens from Supabase
-            try:
-                lens = supabase_store.get_lens_by_id(lens_id)
-                if lens:
-                    frame_lenses.append({
-                        'id': lens_id,
-                        'episode': lens.get('episode'),
-                        'lens_type': lens.get('lens_type'),
-                        'lens_name': lens.get('name'),
-                        'definition': lens.get('definition'),
-                        'examples': lens.get('examples', []),
-                        'related_concepts': lens.get('related_concepts', [])
-                    })
-            except:
-                pass
+        for lens_id in lens_ids:
+            lens = lens_map.get(lens_id)
+            if lens:
+                frame_lenses.append({
+                    'id': lens_id,
+                    'episode': lens.get('episode'),
+                    'lens_type': lens.get('lens_type'),
+                    'lens_name': lens.get('name'),
+                    'definition': lens.get('definition'),
+                    'examples': lens.get('examples', []),
+                    'related_concepts': lens.get('related_concepts', [])
+                })
         
         return jsonify({
             'success': True,
@@ -1170,22 +1278,10 @@ def get_frames():
         })
     
     # Return all frames with basic info
-    frames_with_counts = []
-    for frame in FRAMES:
-        frames_with_counts.append({
-            'id': frame['id'],
-            'name': frame['name'],
-            'description': frame['description'],
-            'lens_count': len(frame.get('lens_ids', [])),
-            'insights': frame.get('insights', ''),
-            'applications': frame.get('applications', []),
-            'metaphor': frame.get('metaphor', '')
-        })
-    
     return jsonify({
         'success': True,
-        'count': len(frames_with_counts),
-        'frames': frames_with_counts
+        'count': len(FRAME_SUMMARIES),
+        'frames': FRAME_SUMMARIES
     })
 
 @app.route('/api/v1/cache/stats', methods=['GET'])
@@ -1209,6 +1305,7 @@ def get_cache_version():
 def clear_cache():
     """Clear the query cache and increment version"""
     query_cache.clear()
+    _central_cached.cache_clear()
     new_version = increment_cache_version()
     return jsonify({
         'success': True,
@@ -1270,12 +1367,15 @@ def after_request(response):
     if request.method == 'OPTIONS':
         response.headers['Access-Control-Max-Age'] = '86400'  # 24 hours
     
-    # Add ETag support for conditional requests
-    if response.get_json():
-        import hashlib
-        content = response.get_data(as_text=True)
-        etag = hashlib.md5(content.encode()).hexdigest()
-        response.headers['ETag'] = f'"{etag}"'
+    # Add ETag support for conditional requests: hash the body bytes (no JSON
+    # re-parse) and answer a matching If-None-Match with an empty 304
+    if response.is_json and not response.is_streamed:
+        body = response.get_data()
+        if xxhash is not None:
+            response.set_etag(xxhash.xxh3_64_hexdigest(body))
+        else:
+            response.set_etag(hashlib.blake2b(body, digest_size=16).hexdigest())
+        response = response.make_conditional(request)
     
     return response
 
@@ -1294,6 +1394,14 @@ except Exception as e:
     lens_graph = None
     graph_enhancer = None
 
+# Deepest neighborhood served; past this a BFS covers most of the graph
+MAX_NEIGHBORHOOD_RADIUS = 4
+
+@lru_cache(maxsize=8)
+def _central_cached(measure: str, graph_sig: int) -> tuple:
+    """Ranked central lenses for a measure, computed once per graph build (graph_sig)"""
+    return tuple(lens_graph.get_central_lenses(measure=measure))
+
 @app.route('/api/v1/creative/journey', methods=['GET'])
 def find_lens_journey():
     """Find conceptual path between two lenses"""
@@ -1313,8 +1421,9 @@ def find_lens_journey():
         }), 400
 
     # Find lens IDs from names
-    source_lens = supabase_store.search_lenses(source, k=1)
-    target_lens = supabase_store.search_lenses(target, k=1)
+    hits = supabase_store.search_lenses_batch([source, target], k=1)
+    source_lens = hits[source]
+    target_lens = hits[target]
 
     if not source_lens or not target_lens:
         return jsonify({
@@ -1329,11 +1438,12 @@ def find_lens_journey():
     paths = lens_graph.find_path(source_id, target_id)
 
     # Enrich with lens details
+    lens_map = supabase_store.get_lenses_by_ids([lens_id for path in paths for lens_id in path])
     enriched_paths = []
     for path in paths:
         enriched_path = []
         for lens_id in path:
-            lens = supabase_store.get_lens_by_id(lens_id)
+            lens = lens_map.get(lens_id)
             if lens:
                 enriched_path.append({
                     'id': lens_id,
@@ -1371,8 +1481,9 @@ def find_bridge_lenses():
     # Find lens IDs
     lens_ids = []
     lens_details = []
+    hits = supabase_store.search_lenses_batch(lens_names, k=1)
     for name in lens_names:
-        results = supabase_store.search_lenses(name, k=1)
+        results = hits[name]
         if results:
             lens_ids.append(results[0]['id'])
             lens_details.append(results[0])
@@ -1387,9 +1498,10 @@ def find_bridge_lenses():
     bridge_ids = lens_graph.find_bridges(lens_ids)
 
     # Enrich with details
+    lens_map = supabase_store.get_lenses_by_ids(bridge_ids)
     bridges = []
     for bridge_id in bridge_ids:
-        lens = supabase_store.get_lens_by_id(bridge_id)
+        lens = lens_map.get(bridge_id)
         if lens:
             bridges.append({
                 'id': bridge_id,
@@ -1438,9 +1550,10 @@ def find_contrasting_lenses():
     contrasts = lens_graph.find_contrasts(lens_id)
 
     # Enrich with details
+    lens_map = supabase_store.get_lenses_by_ids([contrast_id for contrast_id, _ in contrasts])
     enriched_contrasts = []
     for contrast_id, insight in contrasts:
-        lens = supabase_store.get_lens_by_id(contrast_id)
+        lens = lens_map.get(contrast_id)
         if lens:
             enriched_contrasts.append({
                 'id': contrast_id,
@@ -1473,21 +1586,22 @@ def get_central_lenses():
 
         # Try to get central lenses, with fallback for PageRank issues
         try:
-            central = lens_graph.get_central_lenses(measure=measure)[:limit]
+            central = _central_cached(measure.lower(), lens_graph.signature)[:limit]
         except Exception as e:
             # If PageRank fails, fall back to betweenness
             if measure.lower() == 'pagerank':
                 print(f"PageRank failed, falling back to betweenness: {e}")
-                central = lens_graph.get_central_lenses(measure='betweenness')[:limit]
+                central = _central_cached('betweenness', lens_graph.signature)[:limit]
                 fallback_note = "Note: Using betweenness centrality (PageRank temporarily unavailable)"
                 measure = 'betweenness (pagerank fallback)'
             else:
                 raise
 
         # Enrich with details
+        lens_map = supabase_store.get_lenses_by_ids([lens_id for lens_id, _, _ in central])
         enriched = []
         for lens_id, score, name in central:
-            lens = supabase_store.get_lens_by_id(lens_id)
+            lens = lens_map.get(lens_id)
             if lens:
                 enriched.append({
                     'id': lens_id,
@@ -1529,7 +1643,7 @@ def get_lens_neighborhood():
         }), 503
 
     lens_name = request.args.get('lens')
-    radius = int(request.args.get('radius', 2))
+    radius = min(int(request.args.get('radius', 2)), MAX_NEIGHBORHOOD_RADIUS)
 
     if not lens_name:
         return jsonify({
@@ -1551,11 +1665,12 @@ def get_lens_neighborhood():
     neighborhood = lens_graph.get_lens_neighborhood(lens_id, radius=radius)
 
     # Enrich with details
+    lens_map = supabase_store.get_lenses_by_ids([lid for lens_ids in neighborhood.values() for lid in lens_ids])
     enriched_neighborhood = {}
     for edge_type, lens_ids in neighborhood.items():
         enriched_neighborhood[edge_type] = []
         for lid in lens_ids:
-            lens = supabase_store.get_lens_by_id(lid)
+            lens = lens_map.get(lid)
             if lens:
                 enriched_neighborhood[edge_type].append({
                     'id': lid,
@@ -1580,7 +1695,14 @@ def random_lens_provocation():
     # Get optional context parameter
     context = request.args.getlist('context')
 
-    all_lenses = supabase_store.get_all_lenses(limit=500)
+    # Frame coverage for the context doesn't depend on the catalog, so fetch both at once
+    if context:
+        all_lenses, coverage = parallel_fetch(
+            get_all_lens_rows,
+            lambda: calculate_frame_coverage(context),
+        )
+    else:
+        all_lenses = get_all_lens_rows()
 
     if not all_lenses:
         return jsonify({
@@ -1592,7 +1714,6 @@ def random_lens_provocation():
     gap_analysis = None
     if context:
         # Gap-biased mode
-        coverage = calculate_frame_coverage(context)
         random_lens = bias_lens_selection(all_lenses, coverage)
 
         if random_lens is None:
@@ -1645,11 +1766,11 @@ def detect_thinking_gaps():
             'error': 'context parameter required (list of explored lens names)'
         }), 400
 
-    # Calculate coverage
-    coverage = calculate_frame_coverage(context)
-
-    # Get all lenses for sampling
-    all_lenses = supabase_store.get_all_lenses(limit=500)
+    # Calculate coverage, and get all lenses for sampling, concurrently
+    coverage, all_lenses = parallel_fetch(
+        lambda: calculate_frame_coverage(context),
+        get_all_lens_rows,
+    )
 
     if not all_lenses:
         return jsonify({
@@ -1658,35 +1779,25 @@ def detect_thinking_gaps():
         }), 404
 
     # Generate suggestions from unexplored frames (top 5)
-    import random
     suggestions = []
 
+    lens_by_id = {lens['id']: lens for lens in all_lenses}
     for frame_name in coverage['unexplored'][:5]:
-        # Find lenses belonging to this frame (convert frame_name to frame_id for matching)
-        frame_lenses = []
-        for lens in all_lenses:
-            lens_frame_ids = lens.get('frame_ids', [])
-            if isinstance(lens_frame_ids, str):
-                lens_frame_ids = [lens_frame_ids]
-            elif not isinstance(lens_frame_ids, list):
-                lens_frame_ids = []
-
-            # Convert frame_ids to names and check if this lens belongs to the frame
-            lens_frame_names = [get_frame_name_from_id(fid) for fid in lens_frame_ids]
-            if frame_name in lens_frame_names:
-                frame_lenses.append(lens)
+        # Lenses belonging to this frame (membership comes from the frames file, not Supabase)
+        frame_lenses = [lens_by_id[lens_id] for lens_id in FRAME_NAME_TO_LENS_IDS.get(frame_name, ())
+                        if lens_id in lens_by_id]
 
         # Sample up to 3 lenses from this frame
         if frame_lenses:
             sample_count = min(3, len(frame_lenses))
-            sampled = random.sample(frame_lenses, sample_count)
+            sampled = [frame_lenses[i] for i in sampling_rng.choice(len(frame_lenses), size=sample_count, replace=False)]
 
             suggestions.append({
                 'frame': frame_name,
                 'sample_lenses': [
                     {
                         'id': l['id'],
-                        'name': l.get('lens_name'),
+                        'name': l.get('name'),  # Note: 'name' not 'lens_name' in Supabase
                         'definition': l.get('definition'),
                         'episode': l.get('episode')
                     }
@@ -1729,43 +1840,26 @@ def get_lens_clusters():
         # Get clusters from graph
         clusters = lens_graph.get_lens_clusters()
 
+        # Fetch every clustered lens in one query
+        lens_map = supabase_store.get_lenses_by_ids(
+            [lens_id for lens_ids in clusters.values() for lens_id in lens_ids])
+
         # Enrich clusters with lens metadata
         enriched_clusters = []
         for cluster_id, lens_ids in clusters.items():
-            # Get lens details from Supabase
-            lenses = []
-            for lens_id in lens_ids:
-                lens = supabase_store.get_lens_by_id(lens_id)
-                if lens:
-                    lenses.append(lens)
+            lenses = [lens_map[lens_id] for lens_id in lens_ids if lens_id in lens_map]
 
             if not lenses:
                 continue
 
-            # Extract shared characteristics
-            frames = set()
-            concepts = []
-            for l in lenses:
-                # Get frame names
-                frame_ids = l.get('frame_ids', [])
-                if isinstance(frame_ids, str):
-                    frame_ids = [frame_ids]
-                elif not isinstance(frame_ids, list):
-                    frame_ids = []
-
-                for fid in frame_ids:
-                    frame_name = get_frame_name_from_id(fid)
-                    if frame_name:
-                        frames.add(frame_name)
-
-                # Get concepts
-                related_concepts = l.get('related_concepts', [])
-                if isinstance(related_concepts, list):
-                    concepts.extend(related_concepts)
+            # Extract shared characteristics (frame membership comes from the frames file, not Supabase)
+            frames = set().union(*(LENS_ID_TO_FRAME_NAMES.get(l['id'], ()) for l in lenses))
 
             # Count concept frequency
-            from collections import Counter
-            concept_counts = Counter(concepts)
+            concept_counts = Counter(chain.from_iterable(
+                l.get('related_concepts') if isinstance(l.get('related_concepts'), list) else ()
+                for l in lenses
+            ))
             top_concepts = [c for c, count in concept_counts.most_common(10)]
 
             enriched_clusters.append({
@@ -1866,29 +1960,25 @@ def get_dialectic_triads():
             'message': 'No contrasts found for this lens'
         })
 
-    triads = []
+    # Pick a synthesis lens for each antithesis from the graph alone, then
+    # fetch every antithesis and synthesis lens in a single query
+    # Synthesis strategy: find lenses connected to BOTH thesis and antithesis.
+    # The thesis side is the same for every candidate, so build it once.
+    thesis_neighbors = set(lens_graph.neighbors(thesis_id))
+    thesis_neighbors.discard(thesis_id)
 
+    pending = []
     for antithesis_id, contrast_insight in contrasts[:limit * 2]:  # Get more to find valid syntheses
-        if len(triads) >= limit:
-            break
-
-        antithesis = supabase_store.get_lens_by_id(antithesis_id)
-        if not antithesis:
-            continue
-
-        # Find synthesis lens - a lens that bridges thesis and antithesis
-        # Strategy: Find lenses connected to BOTH thesis and antithesis
-        thesis_neighbors = set(lens_graph.graph.neighbors(thesis_id)) if lens_graph.graph.has_node(thesis_id) else set()
-        antithesis_neighbors = set(lens_graph.graph.neighbors(antithesis_id)) if lens_graph.graph.has_node(antithesis_id) else set()
-
         # Common neighbors (excluding thesis and antithesis themselves)
-        common = thesis_neighbors.intersection(antithesis_neighbors) - {thesis_id, antithesis_id}
+        common = thesis_neighbors.intersection(lens_graph.neighbors(antithesis_id))
+        common.discard(antithesis_id)
 
         if not common:
             # Fallback: Find bridge lenses between thesis and antithesis
             try:
-                path = lens_graph.find_path(thesis_id, antithesis_id)
-                if path and len(path) >= 3:
+                paths = lens_graph.find_path(thesis_id, antithesis_id)
+                path = paths[0] if paths else []
+                if len(path) >= 3:
                     # Middle lens is potential synthesis
                     mid_idx = len(path) // 2
                     common = {path[mid_idx]}
@@ -1899,10 +1989,19 @@ def get_dialectic_triads():
             continue
 
         # Get the best synthesis candidate
-        synthesis_id = list(common)[0]
-        synthesis = supabase_store.get_lens_by_id(synthesis_id)
+        pending.append((antithesis_id, contrast_insight, list(common)[0]))
+
+    lens_map = supabase_store.get_lenses_by_ids(
+        [lens_id for antithesis_id, _, synthesis_id in pending for lens_id in (antithesis_id, synthesis_id)])
 
-        if not synthesis:
+    triads = []
+    for antithesis_id, contrast_insight, synthesis_id in pending:
+        if len(triads) >= limit:
+            break
+
+        antithesis = lens_map.get(antithesis_id)
+        synthesis = lens_map.get(synthesis_id)
+        if not antithesis or not synthesis:
             continue
 
         # Generate synthesis insight
@@ -1984,8 +2083,9 @@ def get_lens_progressions():
             'error': 'Both start and target lens names required'
         }), 400
 
-    # Find start lens
-    start_results = supabase_store.search_lenses(start_name, k=1)
+    # Find start and target lenses
+    hits = supabase_store.search_lenses_batch([start_name, target_name], k=1)
+    start_results = hits[start_name]
     if not start_results:
         return jsonify({
             'success': False,
@@ -1995,8 +2095,7 @@ def get_lens_progressions():
     start_lens = start_results[0]
     start_id = start_lens['id']
 
-    # Find target lens
-    target_results = supabase_store.search_lenses(target_name, k=1)
+    target_results = hits[target_name]
     if not target_results:
         return jsonify({
             'success': False,
@@ -2008,19 +2107,21 @@ def get_lens_progressions():
 
     # Find path between lenses
     try:
-        path = lens_graph.find_path(start_id, target_id)
+        paths = lens_graph.find_path(start_id, target_id)
     except Exception as e:
         return jsonify({
             'success': False,
             'error': f'No path found between lenses: {str(e)}'
         }), 404
 
-    if not path:
+    if not paths:
         return jsonify({
             'success': False,
             'error': 'No path found between these lenses'
         }), 404
 
+    path = paths[0]  # Best path
+
     # Limit path length
     if len(path) > max_steps:
         # Sample evenly through the path
@@ -2030,9 +2131,10 @@ def get_lens_progressions():
         path = [path[i] for i in indices]
 
     # Build progression with insights
+    lens_map = supabase_store.get_lenses_by_ids(path)
     progression = []
     for i, lens_id in enumerate(path):
-        lens = supabase_store.get_lens_by_id(lens_id)
+        lens = lens_map.get(lens_id)
         if not lens:
             continue
 
@@ -2081,7 +2183,7 @@ def debug_lens_lookup():
         return jsonify({'error': 'context parameter required'}), 400
 
     # Get all lenses from database
-    all_lenses = supabase_store.get_all_lenses(limit=500)
+    all_lenses = get_all_lens_rows()
 
     # NOTE: Supabase uses 'name' field, not 'lens_name'
     # Find exact matches
@@ -2105,7 +2207,7 @@ def debug_lens_lookup():
         'debug': {
             'requested_lenses': context,
             'exact_matches_found': len(exact_matches),
-            'exact_match_names': [l.get('lens_name') for l in exact_matches],
+            'exact_match_names': [l.get('name') for l in exact_matches],
             'partial_matches': partial_matches,
             'database_sample': sample_names,
             'total_lenses_in_db': len(all_lenses)
@@ -7,6 +7,7 @@ import logging
 import os
 from typing import List, Dict, Set, Tuple, Optional
 from collections import defaultdict, deque
+from itertools import islice
 import networkx as nx
 
 logger = logging.getLogger(__name__)
@@ -14,6 +15,9 @@ logger = logging.getLogger(__name__)
 # Get the directory containing the data files (project root)
 DATA_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Equally short paths ranked by find_path; bounds the work on densely connected pairs
+MAX_CANDIDATE_PATHS = 50
+
 
 class LensGraph:
     """Graph-based lens relationship manager"""
@@ -23,6 +27,7 @@ class LensGraph:
         self._load_lenses()
         self._load_relationships()
         self._build_graph()
+        self._snapshot_adjacency()
     
     def _load_lenses(self):
         """Load all lenses as nodes in the graph"""
@@ -140,16 +145,54 @@ class LensGraph:
                                 shared_concept=concept
                             )
     
+    def _snapshot_adjacency(self):
+        """Capture the built graph as plain dicts for the read-only traversal hot paths"""
+        # lens_id -> {successor_id: edge type}, successors in graph order
+        self._adj = {
+            node: {neighbor: data.get('type', 'unknown') for neighbor, data in successors.items()}
+            for node, successors in self.graph.succ.items()
+        }
+        # Identifies this build of the graph, so callers can key cached results on it
+        self.signature = hash((frozenset(self.graph.nodes), self.graph.number_of_edges()))
+    
+    def neighbors(self, lens_id: str) -> Dict[str, str]:
+        """Successors of a lens mapped to their edge type (empty for unknown lenses)"""
+        return self._adj.get(lens_id, {})
+    
+    def _shortest_paths(self, source_lens_id: str, target_lens_id: str, max_length: int):
+        """Yield the shortest paths between two lenses, if they are at most max_length hops apart"""
+        if source_lens_id not in self._adj or target_lens_id not in self._adj:
+            return
+        
+        # Unit-weight BFS, level by level, recording every parent on a shortest path
+        parents = {source_lens_id: []}
+        frontier = [source_lens_id]
+        while target_lens_id not in parents:
+            if not frontier or max_length <= 0:
+                return
+            max_length -= 1
+            level = {}
+            for node in frontier:
+                for neighbor in self._adj[node]:
+                    if neighbor not in parents:
+                        level.setdefault(neighbor, []).append(node)
+            parents.update(level)
+            frontier = list(level)
+        
+        # Walk the parent links back from the target
+        stack = [(target_lens_id, [target_lens_id])]
+        while stack:
+            node, path = stack.pop()
+            if node == source_lens_id:
+                yield path[::-1]
+            else:
+                stack.extend((parent, path + [parent]) for parent in parents[node])
+    
     def find_path(self, source_lens_id: str, target_lens_id: str, max_length: int = 4) -> List[List[str]]:
-        """Find paths between two lenses"""
+        """Find the shortest paths (by hop count) between two lenses, at most max_length hops long"""
         try:
-            # Find all simple paths up to max_length
-            paths = list(nx.all_simple_paths(
-                self.graph, 
-                source_lens_id, 
-                target_lens_id, 
-                cutoff=max_length
-            ))
+            # Only paths of the shortest length, instead of enumerating every simple path
+            paths = list(islice(self._shortest_paths(source_lens_id, target_lens_id, max_length), MAX_CANDIDATE_PATHS))
             
             # Sort by total weight (higher is better)
             def path_weight(path):
@@ -175,13 +218,12 @@ class LensGraph:
         
         for i, lens1 in enumerate(lens_ids):
             for lens2 in lens_ids[i+1:]:
-                # Find nodes that connect both
-                try:
-                    for path in nx.all_simple_paths(self.graph, lens1, lens2, cutoff=3):
-                        if len(path) == 3:  # Has exactly one bridge
-                            bridges.add(path[1])
-                except:
+                # Find nodes that connect both: lens1 -> bridge -> lens2
+                if lens1 == lens2:
                     continue
+                for bridge in self.neighbors(lens1):
+                    if bridge != lens2 and lens2 in self.neighbors(bridge):
+                        bridges.add(bridge)
         
         # Score bridges by how many pairs they connect
         bridge_scores = {}
@@ -231,11 +273,9 @@ class LensGraph:
                 continue
             
             # Explore neighbors
-            for neighbor in self.graph.neighbors(current):
+            for neighbor, edge_type in self.neighbors(current).items():
                 if neighbor not in visited:
                     visited.add(neighbor)
-                    edge_data = self.graph.get_edge_data(current, neighbor)
-                    edge_type = edge_data.get('type', 'unknown')
                     neighborhood[edge_type].append(neighbor)
                     queue.append((neighbor, depth + 1))
         
@@ -7,7 +7,8 @@ Implements consolidated tag system (76 tags instead of 511).
 import os
 import json
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
 import numpy as np
 from supabase import create_client, Client
@@ -25,6 +26,9 @@ except ImportError:
     HAS_SENTENCE_TRANSFORMERS = False
     logger.warning("sentence-transformers not installed. Will fall back to OpenAI for query embeddings.")
 
+# Columns served by the lens listing endpoint (everything but the embedding vector)
+LENS_LIST_COLUMNS = 'id,episode,lens_type,name,definition,examples,related_concepts,source_url,extracted_at'
+
 class SupabaseLensStore:
     """Supabase-based storage for FLUX lenses with vector search capabilities."""
     
@@ -85,6 +89,26 @@ class SupabaseLensStore:
 
         raise ValueError("No embedding model available (neither local nor OpenAI)")
 
+    def generate_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Batch counterpart of generate_query_embedding - one encode call for all texts.
+        Returns embeddings in the same order as texts.
+        """
+        if self.local_model:
+            try:
+                embeddings = self.local_model.encode(texts, batch_size=32, convert_to_numpy=True)
+                return embeddings.tolist()
+            except Exception as e:
+                logger.error(f"Error generating local embeddings: {e}")
+                # Fall back to OpenAI if local fails
+
+        # Fallback to OpenAI (only if local model unavailable)
+        if self.openai_client:
+            logger.warning("Using OpenAI for query embeddings (local model unavailable)")
+            return self.generate_embeddings_openai(texts)
+
+        raise ValueError("No embedding model available (neither local nor OpenAI)")
+
     def generate_embedding_openai(self, text: str) -> List[float]:
         """
         Generate embedding using OpenAI (for admin/batch operations only).
@@ -104,10 +128,36 @@ class SupabaseLensStore:
             logger.error(f"Error generating OpenAI embedding: {e}")
             raise
 
+    def generate_embeddings_openai(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate OpenAI embeddings for several texts, one request per 2048 inputs.
+        Returns embeddings in the same order as texts.
+        """
+        if not self.openai_client:
+            raise ValueError("OpenAI client not initialized")
+
+        embeddings = []
+        try:
+            for start in range(0, len(texts), 2048):  # API limit on inputs per request
+                response = self.openai_client.embeddings.create(
+                    model="text-embedding-3-small",
+                    input=texts[start:start + 2048],
+                    dimensions=384
+                )
+                embeddings.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+            return embeddings
+        except Exception as e:
+            logger.error(f"Error generating OpenAI embeddings: {e}")
+            raise
+
     # Keep old method name for backward compatibility
     def generate_embedding(self, text: str) -> List[float]:
         """Legacy method - redirects to OpenAI for admin operations."""
         return self.generate_embedding_openai(text)
+
+    def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """Batch counterpart of generate_embedding - one OpenAI round trip for all texts."""
+        return self.generate_embeddings_openai(texts)
     
     def search_lenses(
         self, 
@@ -116,7 +166,8 @@ class SupabaseLensStore:
         filter_tags: Optional[List[str]] = None,
         filter_frame: Optional[str] = None,
         filter_episode: Optional[int] = None,
-        similarity_threshold: float = 0.0
+        similarity_threshold: float = 0.0,
+        query_embedding: Optional[List[float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for lenses using vector similarity.
@@ -128,13 +179,15 @@ class SupabaseLensStore:
             filter_frame: Optional frame to filter by
             filter_episode: Optional episode number to filter by
             similarity_threshold: Minimum similarity score (default 0.0)
+            query_embedding: Precomputed embedding of query, if already known
         
         Returns:
             List of lens dictionaries with similarity scores
         """
         try:
             # Generate embedding for query using FREE local model
-            query_embedding = self.generate_query_embedding(query)
+            if query_embedding is None:
+                query_embedding = self.generate_query_embedding(query)
             
             # Call Supabase RPC function for vector search
             params = {
@@ -189,6 +242,31 @@ class SupabaseLensStore:
             logger.error(f"Error in search_lenses: {e}")
             return []
     
+    def search_lenses_batch(self, queries: List[str], k: int = 10, max_workers: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Search for several queries at once.
+
+        The queries are embedded in one batch, then the search_lenses RPC
+        (one query per call) is issued concurrently.
+
+        Returns:
+            Dictionary mapping each query -> its search_lenses results
+        """
+        unique_queries = list(dict.fromkeys(queries))
+        if not unique_queries:
+            return {}
+        try:
+            embeddings = self.generate_query_embeddings(unique_queries)
+        except Exception as e:
+            logger.error(f"Error in search_lenses_batch: {e}")
+            return {query: [] for query in unique_queries}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_queries))) as executor:
+            results = executor.map(
+                lambda pair: self.search_lenses(pair[0], k, query_embedding=pair[1]),
+                zip(unique_queries, embeddings)
+            )
+            return dict(zip(unique_queries, results))
+
     def get_lens_by_id(self, lens_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific lens by ID."""
         try:
@@ -209,6 +287,50 @@ class SupabaseLensStore:
             logger.error(f"Error getting all lenses: {e}")
             return []
     
+    def get_lenses_filtered(self, lens_type: Optional[str] = None, episode: Optional[Union[int, str]] = None,
+                            ids: Optional[List[str]] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Get lenses matching the given filters, filtered in the database.
+
+        Args:
+            lens_type: Only lenses of this type (headline, weekly)
+            episode: Only lenses from this episode
+            ids: Only lenses with these ids
+            limit: Maximum number of lenses to return
+
+        Returns:
+            Matching lenses, without the embedding columns
+        """
+        if ids is not None and not ids:
+            return []
+        try:
+            query = self.client.table('lenses').select(LENS_LIST_COLUMNS)
+            if lens_type:
+                query = query.eq('lens_type', lens_type)
+            if episode is not None:
+                query = query.eq('episode', episode)
+            if ids is not None:
+                query = query.in_('id', ids)
+            result = query.limit(limit).execute()
+            return result.data if result.data else []
+        except Exception as e:
+            logger.error(f"Error getting filtered lenses: {e}")
+            return []
+
+    def get_lenses_by_ids(self, lens_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several lenses in a single query.
+
+        Args:
+            lens_ids: Lens ids to fetch (duplicates are ignored)
+
+        Returns:
+            Dictionary mapping lens id -> lens, for the ids that were found
+        """
+        unique_ids = list(dict.fromkeys(lens_ids))
+        rows = self.get_lenses_filtered(ids=unique_ids, limit=max(len(unique_ids), 1))
+        return {row['id']: row for row in rows}
+
     def get_lenses_by_episode(self, episode: int) -> List[Dict[str, Any]]:
         """Get all lenses from a specific episode."""
         try:
@@ -242,6 +364,21 @@ class SupabaseLensStore:
             logger.error(f"Error getting related lenses for {lens_id}: {e}")
             return []
 
+    def get_related_lenses_bulk(self, lens_ids: List[str], k: int = 5, max_workers: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Get related lenses for several lenses at once.
+
+        The get_related_lenses RPC takes a single lens, so the calls are issued
+        concurrently instead of one round trip after another.
+
+        Returns:
+            One list of related lenses per lens id, in the same order as lens_ids
+        """
+        if not lens_ids:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(lens_ids))) as executor:
+            return list(executor.map(lambda lens_id: self.get_related_lenses(lens_id, k), lens_ids))
+
     def get_frame_ids_for_lenses(self, lens_names: List[str], lens_to_frames_map: Dict[str, List[str]] = None) -> Dict[str, List[str]]:
         """
         Get frame_id associations for a list of lens names.
@@ -266,61 +403,42 @@ class SupabaseLensStore:
 
             logger.info(f"get_frame_ids_for_lenses: Looking up {len(lens_names)} lenses: {lens_names}")
 
-            # Strategy: Query lenses for id and name, then use lens_to_frames_map
+            # Strategy: Query id and name for just the target lenses (one round-trip,
+            # filtered server-side), then use lens_to_frames_map
             # NOTE: Supabase uses 'name' field, not 'lens_name'
             # NOTE: frame_ids is NOT in Supabase - it comes from lens_frames_thematic.json
+            target_names = list(dict.fromkeys(lens_names))
             result = self.client.table('lenses') \
                 .select('id, name') \
+                .in_('name', target_names) \
                 .execute()
 
-            logger.info(f"get_frame_ids_for_lenses: Query returned {len(result.data) if result.data else 0} total lenses")
-
-            # Create a set of target lens names for fast lookup
-            target_names = set(lens_names)
-            logger.info(f"get_frame_ids_for_lenses: Filtering for {len(target_names)} target lenses")
+            logger.info(f"get_frame_ids_for_lenses: Query returned {len(result.data) if result.data else 0} matching lenses")
 
             if result.data:
-                # Debug: Log first 5 lens names from database
-                db_sample = [lens.get('name') for lens in result.data[:5]]
-                logger.info(f"get_frame_ids_for_lenses: Database sample (first 5): {db_sample}")
-
-                # Build mapping of lens name to frame_ids (only for target lenses)
+                # Build mapping of lens name to frame_ids
                 # frame_ids come from lens_to_frames_map, NOT from Supabase
                 lens_frame_map = {}
                 for lens in result.data:
                     name = lens.get('name')  # Use 'name' not 'lens_name'
                     lens_id = lens.get('id')
 
-                    # Debug: Log each comparison for target lenses
-                    if name in ['The Thinking Hat', 'Getting over the Hump', 'Footguns']:
-                        logger.info(f"get_frame_ids_for_lenses: Found target lens: '{name}' (id: {lens_id})")
-
-                    # Only include if this lens is in our target set
-                    if name in target_names:
-                        # Look up frame_ids from external mapping
-                        frame_ids = lens_to_frames_map.get(lens_id, [])
+                    # Look up frame_ids from external mapping
+                    frame_ids = lens_to_frames_map.get(lens_id, [])
 
-                        # Handle frame_ids as either list or single string
-                        if isinstance(frame_ids, str):
-                            frame_ids = [frame_ids]
-                        elif not isinstance(frame_ids, list):
-                            frame_ids = []
+                    # Handle frame_ids as either list or single string
+                    if isinstance(frame_ids, str):
+                        frame_ids = [frame_ids]
+                    elif not isinstance(frame_ids, list):
+                        frame_ids = []
 
-                        lens_frame_map[name] = frame_ids
-                        logger.info(f"get_frame_ids_for_lenses: Mapped '{name}' -> {len(frame_ids)} frames")
+                    lens_frame_map[name] = frame_ids
+                    logger.info(f"get_frame_ids_for_lenses: Mapped '{name}' -> {len(frame_ids)} frames")
 
-                logger.info(f"get_frame_ids_for_lenses: Built map with {len(lens_frame_map)} entries (filtered from {len(result.data)} total)")
-                if lens_frame_map:
-                    logger.info(f"get_frame_ids_for_lenses: Sample match: {list(lens_frame_map.items())[0]}")
-                else:
-                    logger.warning(f"get_frame_ids_for_lenses: No matches found!")
-                    logger.warning(f"get_frame_ids_for_lenses: Target names (repr): {[repr(n) for n in target_names]}")
-                    # Log some potential matches for debugging
-                    potential = [lens.get('name') for lens in result.data if 'Thinking' in lens.get('name', '')][:3]
-                    logger.warning(f"get_frame_ids_for_lenses: Potential 'Thinking' matches in DB: {potential}")
+                logger.info(f"get_frame_ids_for_lenses: Built map with {len(lens_frame_map)} entries")
                 return lens_frame_map
 
-            logger.warning("get_frame_ids_for_lenses: No results from Supabase query")
+            logger.warning(f"get_frame_ids_for_lenses: No matches found! Target names (repr): {[repr(n) for n in target_names]}")
             return {}
         except Exception as e:
             logger.error(f"Error getting frame_ids for lenses {lens_names}: {e}")
@@ -19,9 +19,16 @@ Scoring:
 
 import os
 import re
+import copy
 import json
-from typing import List, Dict, Set, Tuple
-from pathlib import Path
+import mmap
+import hashlib
+import functools
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Set, Tuple, Union
+
+from problem_files import find_problem_file
 
 # Load FLUX lens vocabulary from benchmark problems or API
 # For now, use curated list of most common lenses
@@ -61,6 +68,9 @@ CONCEPTUAL_FRAMES = {
     'Analysis': ['Root Cause Analysis'],
 }
 
+# Inverse of CONCEPTUAL_FRAMES (each lens belongs to one frame)
+_LENS_TO_FRAME = {lens: frame for frame, lenses in CONCEPTUAL_FRAMES.items() for lens in lenses}
+
 # Application patterns (signals of deep vs superficial usage)
 APPLICATION_PATTERNS = {
     'deep': [
@@ -77,9 +87,61 @@ APPLICATION_PATTERNS = {
 }
 
 
-def normalize_text(text: str) -> str:
-    """Normalize text for matching (lowercase, strip extra whitespace)."""
-    return re.sub(r'\s+', ' ', text.lower().strip())
+def _phrase_key(phrase: str) -> str:
+    """Canonical form of a phrase: casefolded with single spaces between words."""
+    return ' '.join(phrase.casefold().split())
+
+
+def _build_trie_regex(keys: List[str]) -> str:
+    """
+    Render phrase keys as one regex alternation with shared prefixes collapsed.
+
+    E.g. ['feature fatigue', 'feature bloat'] → r'feature\s+(?:bloat|fatigue)'.
+    Spaces become \s+ so any run of whitespace between words still matches, and
+    optional suffixes are greedy so the longest phrase at an offset wins.
+    """
+    trie = {}
+    for key in keys:
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[''] = {}  # End-of-phrase marker
+
+    def render(node: Dict) -> str:
+        branches = [
+            (r'\s+' if char == ' ' else re.escape(char)) + render(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return '(?:' + body + ')?'
+        return body
+
+    return render(trie)
+
+
+# Every lens phrase goes into one scanner so the text is walked once, not once per
+# phrase. The alternation sits inside a lookahead so matches may overlap (e.g.
+# "boundary" inside "system boundary"), like an Aho-Corasick automaton would report.
+_LENS_PHRASES = [
+    (lens_name, [(phrase, _phrase_key(phrase)) for phrase in patterns])
+    for lens_name, patterns in FLUX_LENSES.items()
+]
+_LENS_NAMES_LC = {lens_name: lens_name.casefold() for lens_name in FLUX_LENSES}
+_PHRASE_KEYS = sorted({key for _, phrases in _LENS_PHRASES for _, key in phrases})
+
+# The scanner reports the longest phrase starting at each offset; any shorter phrase
+# that is a prefix of it ("root cause" within "root cause analysis") matched there too.
+_PHRASE_PREFIXES = {key: [k for k in _PHRASE_KEYS if key.startswith(k)] for key in _PHRASE_KEYS}
+
+_LENS_SCAN_RE = re.compile('(?=(' + _build_trie_regex(_PHRASE_KEYS) + '))', re.IGNORECASE)
+_DEEP_COMPILED = [re.compile(p, re.IGNORECASE) for p in APPLICATION_PATTERNS['deep']]
+
+# Bytes twins for scanning mmap'd response files in place (all patterns are ASCII)
+_LENS_SCAN_BYTES_RE = re.compile(_LENS_SCAN_RE.pattern.encode('ascii'), re.IGNORECASE)
+_DEEP_COMPILED_BYTES = [re.compile(p.pattern.encode('ascii'), re.IGNORECASE) for p in _DEEP_COMPILED]
 
 
 def find_lens_mentions(text: str) -> Dict[str, List[str]]:
@@ -89,14 +151,18 @@ def find_lens_mentions(text: str) -> Dict[str, List[str]]:
     Returns:
         Dictionary mapping lens names to list of matched phrases
     """
-    normalized = normalize_text(text)
-    mentions = {}
+    hits = set()
+    for match in _LENS_SCAN_RE.finditer(text):
+        hits.update(_PHRASE_PREFIXES.get(_phrase_key(match.group(1)), ()))
+
+    return _mentions_from_hits(hits)
 
-    for lens_name, patterns in FLUX_LENSES.items():
-        found = []
-        for pattern in patterns:
-            if pattern.lower() in normalized:
-                found.append(pattern)
+
+def _mentions_from_hits(hits: Set[str]) -> Dict[str, List[str]]:
+    """Group matched phrase keys by lens, keeping FLUX_LENSES phrase order."""
+    mentions = {}
+    for lens_name, phrases in _LENS_PHRASES:
+        found = [phrase for phrase, key in phrases if key in hits]
         if found:
             mentions[lens_name] = found
 
@@ -110,22 +176,66 @@ def analyze_application_depth(text: str, lens_mentions: Dict[str, List[str]]) ->
     Returns:
         Dictionary mapping lens names to 'deep' or 'surface'
     """
-    depths = {}
+    # Run each deep pattern once and test every lens against its captures,
+    # rather than rescanning the text per lens
+    deep_captures = set()
+    for pattern in _DEEP_COMPILED:
+        for match in pattern.findall(text):
+            deep_captures.add(match.strip().casefold())
 
+    depths = {}
     for lens_name in lens_mentions.keys():
-        # Check for deep application patterns
-        deep_found = False
-        for pattern in APPLICATION_PATTERNS['deep']:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if any(lens_name.lower() in match.lower() for match in matches):
-                deep_found = True
-                break
-
+        lens_lc = _LENS_NAMES_LC.get(lens_name) or lens_name.casefold()
+        deep_found = any(lens_lc in capture for capture in deep_captures)
         depths[lens_name] = 'deep' if deep_found else 'surface'
 
     return depths
 
 
+def _as_str(span: Union[str, bytes]) -> str:
+    """Decode a matched span from a bytes scan; str spans pass through."""
+    return span if isinstance(span, str) else span.decode('utf-8', 'replace')
+
+
+def scan_response(text: Union[str, bytes]) -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+    """
+    Find lens mentions and their application depth in text.
+
+    Same result as find_lens_mentions followed by analyze_application_depth:
+    one trie scan for every lens phrase, then each deep pattern run once,
+    non-overlapping, as analyze_application_depth does.
+    text may also be a bytes-like buffer (e.g. an mmap of a response file);
+    only the matched spans are decoded.
+
+    Returns:
+        Tuple of (lens_mentions, application_depths)
+    """
+    if isinstance(text, str):
+        lens_scanner, deep_patterns = _LENS_SCAN_RE, _DEEP_COMPILED
+    else:
+        lens_scanner, deep_patterns = _LENS_SCAN_BYTES_RE, _DEEP_COMPILED_BYTES
+
+    hits = set()
+    for match in lens_scanner.finditer(text):
+        hits.update(_PHRASE_PREFIXES.get(_phrase_key(_as_str(match.group(1))), ()))
+
+    mentions = _mentions_from_hits(hits)
+    if not mentions:
+        return mentions, {}
+
+    deep_captures = set()
+    for pattern in deep_patterns:
+        for match in pattern.finditer(text):
+            deep_captures.add(_as_str(match.group(1)).strip().casefold())
+
+    depths = {}
+    for lens_name in mentions:
+        lens_lc = _LENS_NAMES_LC[lens_name]
+        depths[lens_name] = 'deep' if any(lens_lc in capture for capture in deep_captures) else 'surface'
+
+    return mentions, depths
+
+
 def identify_frames_covered(lens_mentions: Dict[str, List[str]]) -> Set[str]:
     """
     Identify which conceptual frames were covered.
@@ -133,14 +243,7 @@ def identify_frames_covered(lens_mentions: Dict[str, List[str]]) -> Set[str]:
     Returns:
         Set of frame names
     """
-    frames = set()
-
-    for lens_name in lens_mentions.keys():
-        for frame, lenses in CONCEPTUAL_FRAMES.items():
-            if lens_name in lenses:
-                frames.add(frame)
-
-    return frames
+    return {_LENS_TO_FRAME[lens_name] for lens_name in lens_mentions if lens_name in _LENS_TO_FRAME}
 
 
 def load_expected_lenses(problem_file: str) -> Tuple[List[str], List[str]]:
@@ -150,9 +253,23 @@ def load_expected_lenses(problem_file: str) -> Tuple[List[str], List[str]]:
     Returns:
         Tuple of (high_relevance_lenses, medium_relevance_lenses)
     """
-    if not os.path.exists(problem_file):
+    try:
+        mtime = os.path.getmtime(problem_file)
+    except OSError:
         return [], []
 
+    high, medium = _parse_expected_lenses(os.path.abspath(problem_file), mtime)
+    return list(high), list(medium)
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_expected_lenses(problem_file: str, mtime: float) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Read and parse a problem file once per (path, mtime).
+
+    Batch runs score many responses against the same problem; keying on mtime
+    picks up edits to the problem file without a manual cache reset.
+    """
     with open(problem_file, 'r') as f:
         content = f.read()
 
@@ -174,7 +291,7 @@ def load_expected_lenses(problem_file: str) -> Tuple[List[str], List[str]]:
         high = [l.strip() for l in high_text.split(',')]
         medium = [l.strip() for l in medium_text.split(',')]
 
-    return high, medium
+    return tuple(high), tuple(medium)
 
 
 def calculate_coverage_score(
@@ -226,22 +343,57 @@ def calculate_coverage_score(
     return round(total, 1), breakdown
 
 
-def analyze_response(response_text: str, problem_file: str = None) -> Dict:
+# LRU of analyze_response results keyed by (scan mode, content digest,
+# problem_file, mtime). str and bytes inputs go through different regex sets,
+# so they never share an entry
+ANALYSIS_CACHE_SIZE = 512
+_ANALYSIS_CACHE = OrderedDict()
+
+
+def analyze_response(response_text: Union[str, bytes], problem_file: str = None) -> Dict:
     """
     Analyze a response for frame coverage.
 
     Args:
-        response_text: Agent's response text
+        response_text: Agent's response text (str or UTF-8 bytes-like buffer)
         problem_file: Optional path to problem.md to load expected lenses
 
     Returns:
         Dictionary with coverage metrics
     """
-    # Find lens mentions
-    lens_mentions = find_lens_mentions(response_text)
+    # Sweeps re-score the same responses (e.g. against several problem files),
+    # so results are memoized by content digest + problem file version
+    problem_mtime = None
+    if problem_file and os.path.exists(problem_file):
+        problem_mtime = os.path.getmtime(problem_file)
+    is_text = isinstance(response_text, str)
+    key = (
+        'str' if is_text else 'bytes',
+        hashlib.blake2b(
+            response_text.encode('utf-8') if is_text else response_text,
+            digest_size=16
+        ).digest(),
+        problem_file,
+        problem_mtime,
+    )
+
+    result = _ANALYSIS_CACHE.get(key)
+    if result is None:
+        result = _analyze_response(response_text, problem_file)
+        _ANALYSIS_CACHE[key] = result
+        if len(_ANALYSIS_CACHE) > ANALYSIS_CACHE_SIZE:
+            _ANALYSIS_CACHE.popitem(last=False)
+    else:
+        _ANALYSIS_CACHE.move_to_end(key)
+
+    # Callers annotate the result (see analyze_file), so never hand out the cached dict
+    return copy.deepcopy(result)
 
-    # Analyze application depth
-    depths = analyze_application_depth(response_text, lens_mentions)
+
+def _analyze_response(response_text: Union[str, bytes], problem_file: str = None) -> Dict:
+    """Uncached body of analyze_response."""
+    # Find lens mentions and how deeply each is applied
+    lens_mentions, depths = scan_response(response_text)
 
     # Identify frames covered
     frames = identify_frames_covered(lens_mentions)
@@ -269,43 +421,60 @@ def analyze_response(response_text: str, problem_file: str = None) -> Dict:
     }
 
 
-def analyze_file(response_file: str, problem_file: str = None) -> Dict:
+def analyze_file(response_file: str, problem_file: str = None, content: str = None) -> Dict:
     """
     Analyze a response file for frame coverage.
 
     Args:
         response_file: Path to agent response markdown
         problem_file: Optional path to corresponding problem.md
+        content: The file's text, if the caller has already read it
 
     Returns:
         Dictionary with coverage metrics
     """
-    with open(response_file, 'r') as f:
-        content = f.read()
-
     # Auto-detect problem file if not provided
     if not problem_file:
         # Try to infer from filename
-        # E.g., "results/baseline/performance-stuck_with-interlens.md"
-        #    → "problems/code/performance-stuck.md"
-        basename = os.path.basename(response_file)
-        problem_id = basename.split('_')[0]  # Get "performance-stuck"
-
-        # Search for problem file
-        benchmark_dir = Path(__file__).parent.parent
-        for domain in ['code', 'design', 'strategy', 'product', 'team']:
-            candidate = benchmark_dir / 'problems' / domain / f'{problem_id}.md'
-            if candidate.exists():
-                problem_file = str(candidate)
-                break
-
-    result = analyze_response(content, problem_file)
+        problem_file = find_problem_file(response_file)
+
+    if content is not None:
+        result = analyze_response(content, problem_file)
+    else:
+        # Scan the file through a read-only mapping instead of copying it into a str
+        with open(response_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                result = analyze_response(b'', problem_file)  # mmap rejects empty files
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    result = analyze_response(mapped, problem_file)
+
     result['response_file'] = response_file
     result['problem_file'] = problem_file
 
     return result
 
 
+def analyze_files(response_files: List[str], problem_file: str = None, max_workers: int = None) -> List[Dict]:
+    """
+    Analyze many response files in parallel across processes.
+
+    Scoring is pure CPU and independent per file. Each worker builds the
+    compiled scanners once when it imports this module.
+
+    Args:
+        response_files: Paths to agent response markdown files
+        problem_file: Optional problem.md shared by all files (auto-detected per file if omitted)
+        max_workers: Process count (defaults to the number of CPUs)
+
+    Returns:
+        List of coverage results, in the same order as response_files
+    """
+    analyze = functools.partial(analyze_file, problem_file=problem_file)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(analyze, response_files, chunksize=8))
+
+
 def compare_responses(baseline_file: str, improved_file: str, problem_file: str = None) -> Dict:
     """
     Compare frame coverage between baseline and improved responses.
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Problem File Lookup
+
+Shared by the metrics that auto-detect a response's problem.md from its file
+name: "results/baseline/performance-stuck_with-interlens.md" belongs to
+"problems/code/performance-stuck.md".
+"""
+
+import os
+import functools
+from typing import Dict, Optional
+from pathlib import Path
+
+PROBLEMS_DIR = Path(__file__).parent.parent / 'problems'
+
+# Searched in this order; earlier domains win when two share a problem id
+DOMAINS = ['code', 'design', 'strategy', 'product', 'team']
+
+
+@functools.lru_cache(maxsize=1)
+def problem_index() -> Dict[str, str]:
+    """
+    Map problem id (file stem) to its problem.md path.
+
+    Built once by listing problems/<domain>/ so auto-detection is a dict hit
+    instead of a stat() per domain per response.
+    """
+    index = {}
+    for domain in DOMAINS:
+        for path in sorted((PROBLEMS_DIR / domain).glob('*.md')):
+            index.setdefault(path.stem, str(path))
+    return index
+
+
+def find_problem_file(response_file: str) -> Optional[str]:
+    """Problem file for a "<problem_id>_<condition>.md" response, or None if there is none."""
+    problem_id = os.path.basename(response_file).split('_')[0]
+    return problem_index().get(problem_id)
@@ -18,14 +18,34 @@ Cost: ~$0.01-0.05 per evaluation (Claude Sonnet 4.5 API)
 import os
 import re
 import json
-from typing import Dict, List, Tuple
-from pathlib import Path
-from anthropic import Anthropic
+import asyncio
+import weakref
+import functools
+from typing import Dict, List, Optional, Tuple
+from anthropic import Anthropic, AsyncAnthropic
+
+from problem_files import find_problem_file
 
 # Initialize Anthropic client
 client = Anthropic(api_key=os.environ.get('ANTHROPIC_API_KEY'))
 MODEL = 'claude-sonnet-4-5-20250929'
 
+# Async clients pool connections on the event loop that created them, so keep
+# one per loop (each asyncio.run() gets its own)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _get_async_client() -> AsyncAnthropic:
+    """Return the AsyncAnthropic client bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        _async_clients[loop] = AsyncAnthropic(api_key=os.environ.get('ANTHROPIC_API_KEY'))
+    return _async_clients[loop]
+
+
+# Bump whenever EVALUATION_PROMPT or the scoring rubric changes, so cached
+# judge verdicts from the old rubric are not reused
+RUBRIC_VERSION = 1
 
 EVALUATION_PROMPT = """You are an expert evaluator assessing the quality of creative problem-solving responses.
 
@@ -91,6 +111,33 @@ Return a JSON object with this structure:
 
 Be rigorous. Reserve 9-10 scores for truly exceptional work. Most responses will be 4-7 range."""
 
+# Used when a response was only extended since its last evaluation: the judge
+# sees its previous verdict and the appended text instead of the whole file
+DELTA_PROMPT = """You previously scored an AI agent's response using the rubric below. The response has since been extended: its earlier content is unchanged. Your previous assessment is shown first; the problem and reference solutions follow as before, but the "Response to Evaluate" section holds only the newly appended text.
+
+Re-score the response as a whole (earlier content plus the addition). Keep a score unchanged where the addition does not affect it, and return the same JSON structure as before."""
+
+# Judge-output fields carried into a delta prompt (metadata is dropped)
+_ASSESSMENT_FIELDS = (
+    'scores', 'ranking', 'strengths', 'weaknesses',
+    'comparison_to_baseline', 'comparison_to_target', 'key_insight',
+)
+
+
+# Problem.md sections and the "## " heading each is read from. A heading may
+# carry a suffix ("## Baseline Solution Pattern").
+PROBLEM_SECTIONS = {
+    'context': 'context',
+    'challenge': 'challenge',
+    'baseline': 'baseline solution',
+    'target': 'target solution',
+    'prompt': 'prompt for agent',
+}
+
+# Zero-width split point before every "## " heading line; "###" subsections
+# stay inside their section's body
+_HEADING_SPLIT_RE = re.compile(r'^(?=##\s)', re.MULTILINE)
+
 
 def load_problem_file(problem_file: str) -> Dict[str, str]:
     """
@@ -99,51 +146,50 @@ def load_problem_file(problem_file: str) -> Dict[str, str]:
     Returns:
         Dictionary with problem components
     """
-    with open(problem_file, 'r') as f:
-        content = f.read()
+    sections = _parse_problem_file(os.path.abspath(problem_file), os.path.getmtime(problem_file))
+    return dict(sections)
 
-    # Extract sections using regex
-    sections = {}
 
-    # Context (everything between ## Context and ## Challenge)
-    context_match = re.search(r'## Context\s+(.+?)\s+## Challenge', content, re.DOTALL)
-    sections['context'] = context_match.group(1).strip() if context_match else ""
+@functools.lru_cache(maxsize=128)
+def _parse_problem_file(problem_file: str, mtime: float) -> Dict[str, str]:
+    """
+    Read and parse a problem file once per (path, mtime).
 
-    # Challenge
-    challenge_match = re.search(r'## Challenge\s+(.+?)\s+(?:##|$)', content, re.DOTALL)
-    sections['challenge'] = challenge_match.group(1).strip() if challenge_match else ""
+    Callers get a copy via load_problem_file, so the cached dict is never mutated.
+    """
+    with open(problem_file, 'r') as f:
+        content = f.read()
 
-    # Baseline Solution
-    baseline_match = re.search(r'## Baseline Solution\s+(.+?)\s+##', content, re.DOTALL)
-    sections['baseline'] = baseline_match.group(1).strip() if baseline_match else ""
+    # Split the file once on headings instead of searching it per section
+    bodies = {}
+    for part in _HEADING_SPLIT_RE.split(content):
+        if not part.startswith('##'):
+            continue
+        heading, _, body = part.partition('\n')
+        bodies.setdefault(heading.lstrip('#').strip().lower(), body.strip())
 
-    # Target Solution
-    target_match = re.search(r'## Target Solution\s+(.+?)\s+##', content, re.DOTALL)
-    sections['target'] = target_match.group(1).strip() if target_match else ""
+    sections = {}
+    for name, heading in PROBLEM_SECTIONS.items():
+        sections[name] = next(
+            (body for title, body in bodies.items() if title == heading or title.startswith(heading + ' ')),
+            ""
+        )
 
-    # Problem statement (for agent prompt)
-    prompt_match = re.search(r'## Prompt for Agent\s+```\s+(.+?)\s+```', content, re.DOTALL)
-    sections['prompt'] = prompt_match.group(1).strip() if prompt_match else ""
+    # The agent prompt is the fenced block under its heading
+    prompt = sections['prompt']
+    if prompt.startswith('```'):
+        prompt = prompt[3:]
+        fence_end = prompt.find('```')
+        sections['prompt'] = (prompt[:fence_end] if fence_end != -1 else prompt).strip()
+    else:
+        sections['prompt'] = ""
 
     return sections
 
 
-def evaluate_response(
-    response_text: str,
-    problem_sections: Dict[str, str]
-) -> Dict:
-    """
-    Evaluate a response using Claude Sonnet 4.5 as judge.
-
-    Args:
-        response_text: Agent's response to evaluate
-        problem_sections: Parsed problem.md sections
-
-    Returns:
-        Evaluation results dictionary
-    """
-    # Construct evaluation prompt
-    user_message = f"""## Problem
+def _build_user_message(response_text: str, problem_sections: Dict[str, str]) -> str:
+    """Render the problem, reference solutions, and response into the judge prompt."""
+    return f"""## Problem
 
 {problem_sections.get('prompt', '')}
 
@@ -169,49 +215,199 @@ def evaluate_response(
 
 Please evaluate the response above using the scoring rubric. Return your assessment as JSON."""
 
-    # Call Claude Sonnet 4.5
+
+def _judge_request(response_text: str, problem_sections: Dict[str, str]) -> Dict:
+    """Keyword arguments for the judge's messages call."""
+    return {
+        'model': MODEL,
+        'max_tokens': 2000,
+        'temperature': 0.3,  # Lower temperature for more consistent scoring
+        'messages': [
+            {
+                "role": "user",
+                "content": EVALUATION_PROMPT + "\n\n" + _build_user_message(response_text, problem_sections)
+            }
+        ]
+    }
+
+
+def _delta_request(previous_verdict: Dict, appended_text: str, problem_sections: Dict[str, str]) -> Dict:
+    """Keyword arguments for a judge call that re-scores only appended text."""
+    previous = {k: previous_verdict[k] for k in _ASSESSMENT_FIELDS if k in previous_verdict}
+    content = f"""{DELTA_PROMPT}
+
+{EVALUATION_PROMPT}
+
+## Previous Assessment
+
+```json
+{json.dumps(previous, indent=2)}
+```
+
+{_build_user_message(appended_text, problem_sections)}"""
+
+    return {
+        'model': MODEL,
+        'max_tokens': 2000,
+        'temperature': 0.3,
+        'messages': [{"role": "user", "content": content}]
+    }
+
+
+def _extract_json_object(content: str) -> str:
+    """
+    Return the first balanced {...} object in content (after a ```json fence if any).
+
+    One forward scan tracking brace depth; string literals are skipped so braces
+    inside JSON strings don't close the object early.
+    """
+    fence = content.find('```json')
+    start = content.find('{', fence if fence != -1 else 0)
+    if start == -1:
+        return content
+
+    depth = 0
+    in_string = escaped = False
+    for i in range(start, len(content)):
+        char = content[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return content[start:i + 1]
+
+    return content[start:]
+
+
+def _parse_evaluation(content: str, usage) -> Dict:
+    """Extract the JSON verdict from the judge's reply and attach metadata."""
+    evaluation = json.loads(_extract_json_object(content))
+
+    # Add metadata
+    evaluation['model'] = MODEL
+    evaluation['tokens_used'] = usage.input_tokens + usage.output_tokens
+
+    return evaluation
+
+
+def _evaluation_error(error: Exception) -> Dict:
+    """Zero-score result returned when the judge call or parsing fails."""
+    return {
+        'error': str(error),
+        'scores': {
+            'specificity': 0,
+            'novelty': 0,
+            'actionability': 0,
+            'coherence': 0,
+            'average': 0
+        },
+        'ranking': 'Error'
+    }
+
+
+def evaluate_response(
+    response_text: str,
+    problem_sections: Dict[str, str]
+) -> Dict:
+    """
+    Evaluate a response using Claude Sonnet 4.5 as judge.
+
+    Args:
+        response_text: Agent's response to evaluate
+        problem_sections: Parsed problem.md sections
+
+    Returns:
+        Evaluation results dictionary
+    """
     try:
-        response = client.messages.create(
-            model=MODEL,
-            max_tokens=2000,
-            temperature=0.3,  # Lower temperature for more consistent scoring
-            messages=[
-                {
-                    "role": "user",
-                    "content": EVALUATION_PROMPT + "\n\n" + user_message
-                }
-            ]
-        )
+        # Stream so text is consumed as it is generated rather than in one final payload
+        with client.messages.stream(**_judge_request(response_text, problem_sections)) as stream:
+            content = ''.join(stream.text_stream)
+            usage = stream.get_final_message().usage
+        return _parse_evaluation(content, usage)
+    except Exception as e:
+        return _evaluation_error(e)
 
-        # Extract JSON from response
-        content = response.content[0].text
 
-        # Try to parse JSON (might be wrapped in markdown code blocks)
-        json_match = re.search(r'```json\s*(\{.+?\})\s*```', content, re.DOTALL)
-        if json_match:
-            evaluation = json.loads(json_match.group(1))
-        else:
-            # Try to parse entire response as JSON
-            evaluation = json.loads(content)
+async def evaluate_response_async(
+    response_text: str,
+    problem_sections: Dict[str, str]
+) -> Dict:
+    """
+    Async variant of evaluate_response, so several judge calls can be in flight at once.
+
+    Returns:
+        Evaluation results dictionary
+    """
+    try:
+        async with _get_async_client().messages.stream(**_judge_request(response_text, problem_sections)) as stream:
+            content = await stream.get_final_text()
+            usage = (await stream.get_final_message()).usage
+        return _parse_evaluation(content, usage)
+    except Exception as e:
+        return _evaluation_error(e)
 
-        # Add metadata
-        evaluation['model'] = MODEL
-        evaluation['tokens_used'] = response.usage.input_tokens + response.usage.output_tokens
 
-        return evaluation
+async def evaluate_response_delta_async(
+    previous_verdict: Dict,
+    appended_text: str,
+    problem_sections: Dict[str, str]
+) -> Dict:
+    """
+    Re-score a response that was only extended since previous_verdict.
 
+    The problem and reference solutions are sent as for a full evaluation, but
+    of the response only the appended text (with the previous assessment), so
+    the cost scales with the size of the edit rather than the whole response.
+
+    Returns:
+        Evaluation results dictionary
+    """
+    try:
+        async with _get_async_client().messages.stream(**_delta_request(previous_verdict, appended_text, problem_sections)) as stream:
+            content = await stream.get_final_text()
+            usage = (await stream.get_final_message()).usage
+        return _parse_evaluation(content, usage)
     except Exception as e:
-        return {
-            'error': str(e),
-            'scores': {
-                'specificity': 0,
-                'novelty': 0,
-                'actionability': 0,
-                'coherence': 0,
-                'average': 0
-            },
-            'ranking': 'Error'
-        }
+        return _evaluation_error(e)
+
+
+def resolve_problem_file(response_file: str, problem_file: str = None) -> Optional[str]:
+    """
+    Problem file for a response: problem_file if given, else auto-detected from
+    the response's "<problem_id>_..." file name. None if it does not exist.
+    """
+    if not problem_file:
+        problem_file = find_problem_file(response_file)
+
+    if not problem_file or not os.path.exists(problem_file):
+        return None
+
+    return problem_file
+
+
+def _prepare_file(response_file: str, problem_file: str = None) -> Tuple[str, str]:
+    """
+    Read a response file and resolve its problem file.
+
+    Returns:
+        Tuple of (response_text, problem_file), problem_file is None if not found
+    """
+    # Read response
+    with open(response_file, 'r', encoding='utf-8', buffering=1 << 20) as f:
+        response_text = f.read()
+
+    return response_text, resolve_problem_file(response_file, problem_file)
 
 
 def analyze_file(response_file: str, problem_file: str = None) -> Dict:
@@ -225,33 +421,15 @@ def analyze_file(response_file: str, problem_file: str = None) -> Dict:
     Returns:
         Dictionary with quality evaluation
     """
-    # Read response
-    with open(response_file, 'r') as f:
-        response_text = f.read()
-
-    # Auto-detect problem file if not provided
+    response_text, problem_file = _prepare_file(response_file, problem_file)
     if not problem_file:
-        basename = os.path.basename(response_file)
-        problem_id = basename.split('_')[0]
-
-        benchmark_dir = Path(__file__).parent.parent
-        for domain in ['code', 'design', 'strategy', 'product', 'team']:
-            candidate = benchmark_dir / 'problems' / domain / f'{problem_id}.md'
-            if candidate.exists():
-                problem_file = str(candidate)
-                break
-
-    if not problem_file or not os.path.exists(problem_file):
         return {
             'error': f'Problem file not found for {response_file}',
             'response_file': response_file
         }
 
-    # Load problem sections
-    problem_sections = load_problem_file(problem_file)
-
     # Evaluate response
-    evaluation = evaluate_response(response_text, problem_sections)
+    evaluation = evaluate_response(response_text, load_problem_file(problem_file))
 
     # Add file metadata
     evaluation['response_file'] = response_file
@@ -260,6 +438,28 @@ def analyze_file(response_file: str, problem_file: str = None) -> Dict:
     return evaluation
 
 
+async def analyze_file_async(response_file: str, problem_file: str = None) -> Dict:
+    """
+    Async variant of analyze_file; the judge call is awaited rather than blocking.
+
+    Returns:
+        Dictionary with quality evaluation
+    """
+    response_text, problem_file = _prepare_file(response_file, problem_file)
+    if not problem_file:
+        return {
+            'error': f'Problem file not found for {response_file}',
+            'response_file': response_file
+        }
+
+    evaluation = await evaluate_response_async(response_text, load_problem_file(problem_file))
+
+    evaluation['response_file'] = response_file
+    evaluation['problem_file'] = problem_file
+
+    return evaluation
+
+
 def compare_responses(baseline_file: str, improved_file: str, problem_file: str = None) -> Dict:
     """
     Compare quality between baseline and improved responses.
@@ -267,8 +467,23 @@ def compare_responses(baseline_file: str, improved_file: str, problem_file: str
     Returns:
         Comparison metrics
     """
-    baseline = analyze_file(baseline_file, problem_file)
-    improved = analyze_file(improved_file, problem_file)
+    return asyncio.run(compare_responses_async(baseline_file, improved_file, problem_file))
+
+
+async def compare_responses_async(baseline_file: str, improved_file: str, problem_file: str = None) -> Dict:
+    """
+    Compare quality between baseline and improved responses.
+
+    Both judge calls are issued concurrently, so a comparison takes about as
+    long as a single evaluation.
+
+    Returns:
+        Comparison metrics
+    """
+    baseline, improved = await asyncio.gather(
+        analyze_file_async(baseline_file, problem_file),
+        analyze_file_async(improved_file, problem_file)
+    )
 
     if 'error' in baseline or 'error' in improved:
         return {
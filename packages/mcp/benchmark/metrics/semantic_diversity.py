@@ -17,16 +17,82 @@ Inspired by: Divergent benchmark (Vafa et al., 2024)
 import os
 import re
 import json
+import sqlite3
+import hashlib
+import difflib
+import threading
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 import numpy as np
 from typing import List, Dict, Tuple
 from openai import OpenAI
 
-# Use OpenAI for embeddings (text-embedding-3-small, 384 dimensions)
+try:
+    from scipy.spatial.distance import pdist
+except ImportError:
+    pdist = None  # Falls back to the NumPy matmul path
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Use OpenAI for embeddings (text-embedding-3-small, 256 dimensions)
 # Cost: ~$0.00002 per 1K tokens (very cheap)
-client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+# One pooled client is shared by every call (and by the concurrent batch
+# path), so TCP/TLS setup is paid once; HTTP/2 multiplexes when h2 is installed
+client = OpenAI(
+    api_key=os.environ.get('OPENAI_API_KEY'),
+    max_retries=3,
+    http_client=httpx.Client(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        timeout=30.0,
+    ),
+)
 
 EMBEDDING_MODEL = 'text-embedding-3-small'
-EMBEDDING_DIMENSIONS = 384
+# Diversity only needs cosine ranking, which survives truncation well; fewer
+# dimensions means less data through the pairwise-distance kernel.
+# Override with INTERLENS_EMBEDDING_DIMENSIONS (e.g. 384 or 128).
+EMBEDDING_DIMENSIONS = int(os.environ.get('INTERLENS_EMBEDDING_DIMENSIONS', 256))
+
+# Embeddings are deterministic per (model, dimensions, text), so they are kept
+# on disk across runs; repeated concepts cost nothing after the first call
+EMBEDDING_CACHE_PATH = os.path.expanduser('~/.cache/interlens/embeddings.db')
+_SQLITE_MAX_PARAMS = 500
+
+# Bump whenever concept extraction, near-duplicate dropping or scoring changes,
+# so per-file results computed by the old pipeline are not reused
+RESULTS_VERSION = 1
+
+# OpenAI accepts at most 2048 inputs per embeddings request; larger batches are
+# split and sent with bounded concurrency
+EMBEDDING_BATCH_SIZE = 2048
+EMBEDDING_MAX_WORKERS = 5
+
+# Process-wide cap on in-flight embedding requests, so callers that analyze
+# files from several threads at once still stay within EMBEDDING_MAX_WORKERS
+_EMBEDDING_SLOTS = threading.BoundedSemaphore(EMBEDDING_MAX_WORKERS)
+
+# Concepts at least this similar (difflib ratio) to one already kept are
+# dropped before embedding; they would only add near-zero distances
+NEAR_DUPLICATE_RATIO = 0.85
+
+# Concept extraction patterns, compiled once. Bullets are matched across the
+# whole text in MULTILINE mode; [^\S\n] keeps the whitespace runs on one line.
+_BULLET_RE = re.compile(r'^[^\S\n]*[-•*][^\S\n]+(.+)$', re.MULTILINE)
+_LENS_RE = re.compile(r'(?:through|using|via|with|applying)\s+([A-Z][A-Za-z\s&]+?)(?:\s*:|,|\.|$)', re.IGNORECASE)
+_QUOTE_RE = re.compile(r'"([^"]{10,100})"')
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+# Substring match on any strategic keyword, one pass per sentence
+_STRATEGY_RE = re.compile(
+    r'solution|approach|strategy|breakthrough|insight|pattern|problem|cause|layer|system|loop',
+    re.IGNORECASE,
+)
+_WHITESPACE_RE = re.compile(r'\s+')
 
 
 def extract_concepts(text: str, min_length: int = 3) -> List[str]:
@@ -46,106 +112,222 @@ def extract_concepts(text: str, min_length: int = 3) -> List[str]:
     Returns:
         List of concept strings
     """
+    # Each extractor below is its own C-level scan on purpose. A combined
+    # alternation drops matches that overlap across extractors (a bullet that
+    # also names a lens), and a per-position lookahead that keeps them runs
+    # several times slower than these separate passes.
     concepts = []
 
     # Extract bullet points and list items (common in agent responses)
-    bullet_pattern = r'^[\s]*[-•*]\s+(.+)$'
-    for line in text.split('\n'):
-        match = re.match(bullet_pattern, line)
-        if match:
-            concepts.append(match.group(1).strip())
+    concepts.extend(m.strip() for m in _BULLET_RE.findall(text))
 
     # Extract lens mentions (e.g., "Pace Layering", "Explore vs Exploit")
-    lens_pattern = r'(?:through|using|via|with|applying)\s+([A-Z][A-Za-z\s&]+?)(?:\s*:|,|\.|$)'
-    lens_matches = re.findall(lens_pattern, text, re.IGNORECASE)
-    concepts.extend([m.strip() for m in lens_matches])
+    concepts.extend(m.strip() for m in _LENS_RE.findall(text))
 
     # Extract quoted concepts (often key insights)
-    quote_pattern = r'"([^"]{10,100})"'
-    quote_matches = re.findall(quote_pattern, text)
-    concepts.extend(quote_matches)
+    concepts.extend(_QUOTE_RE.findall(text))
 
     # Extract sentences with key strategic words
-    strategy_keywords = [
-        'solution', 'approach', 'strategy', 'breakthrough', 'insight',
-        'pattern', 'problem', 'cause', 'layer', 'system', 'loop'
-    ]
-    sentences = re.split(r'[.!?]+', text)
-    for sentence in sentences:
-        if any(kw in sentence.lower() for kw in strategy_keywords):
-            if len(sentence.strip()) > min_length:
-                concepts.append(sentence.strip())
+    for sentence in _SENTENCE_SPLIT_RE.split(text):
+        if _STRATEGY_RE.search(sentence):
+            sentence = sentence.strip()
+            if len(sentence) > min_length:
+                concepts.append(sentence)
+
+    # Deduplicate (keeping first-seen order) and filter by length in one pass
+    return [c for c in dict.fromkeys(concepts) if len(c) >= min_length]
 
-    # Deduplicate and filter by length
-    unique_concepts = list(set(concepts))
-    filtered = [c for c in unique_concepts if len(c) >= min_length]
 
-    return filtered
+def drop_near_duplicates(concepts: List[str], threshold: float = NEAR_DUPLICATE_RATIO) -> List[str]:
+    """
+    Greedily drop concepts that are near-duplicates of an earlier one.
+
+    Args:
+        concepts: Concepts in extraction order
+        threshold: SequenceMatcher ratio at or above which two concepts match
+
+    Returns:
+        The first concept of each near-duplicate group, in order
+    """
+    kept = []
+    matcher = difflib.SequenceMatcher(autojunk=False)
+    for concept in concepts:
+        # seq2 is cached by SequenceMatcher, so set the new concept there once
+        matcher.set_seq2(concept)
+        for other in kept:
+            matcher.set_seq1(other)
+            if (matcher.real_quick_ratio() >= threshold
+                    and matcher.quick_ratio() >= threshold
+                    and matcher.ratio() >= threshold):
+                break
+        else:
+            kept.append(concept)
+    return kept
+
+
+def _normalize_for_cache(text: str) -> str:
+    """Collapse case, whitespace and trailing punctuation so trivial variants share a vector."""
+    return _WHITESPACE_RE.sub(' ', text).strip().rstrip('.,:;!?').lower()
+
+
+def _embedding_cache_key(text: str) -> bytes:
+    """Cache key for one text (after normalization) under the current model and dimensions."""
+    normalized = _normalize_for_cache(text)
+    return hashlib.sha256(f"{EMBEDDING_MODEL}|{EMBEDDING_DIMENSIONS}|{normalized}".encode('utf-8')).digest()
+
+
+def _open_embedding_cache() -> sqlite3.Connection:
+    """Open (creating if needed) the on-disk embedding cache."""
+    os.makedirs(os.path.dirname(EMBEDDING_CACHE_PATH), exist_ok=True)
+    conn = sqlite3.connect(EMBEDDING_CACHE_PATH, timeout=30)
+    conn.execute('CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vec BLOB)')
+    conn.execute('CREATE TABLE IF NOT EXISTS file_results (key TEXT PRIMARY KEY, result TEXT)')
+    return conn
+
+
+def _file_result_key(filepath: str) -> str:
+    """Cache key for a file's result: path, mtime, size, results version and embedding settings."""
+    st = os.stat(filepath)
+    return json.dumps([os.path.abspath(filepath), st.st_mtime_ns, st.st_size,
+                       RESULTS_VERSION, EMBEDDING_MODEL, EMBEDDING_DIMENSIONS])
+
+
+def _load_file_results(keys: List[str]) -> Dict[str, Dict]:
+    """Previously computed results for unchanged files, by key."""
+    results = {}
+    with closing(_open_embedding_cache()) as conn:
+        for start in range(0, len(keys), _SQLITE_MAX_PARAMS):
+            chunk = keys[start:start + _SQLITE_MAX_PARAMS]
+            placeholders = ','.join('?' * len(chunk))
+            for key, result in conn.execute(f'SELECT key, result FROM file_results WHERE key IN ({placeholders})', chunk):
+                results[key] = json.loads(result)
+    return results
+
+
+def _store_file_results(results: Dict[str, Dict]):
+    """Persist per-file results so later runs skip extract → embed → score."""
+    with closing(_open_embedding_cache()) as conn:
+        conn.executemany('INSERT OR REPLACE INTO file_results (key, result) VALUES (?, ?)',
+                         [(key, json.dumps(result)) for key, result in results.items()])
+        conn.commit()
+
+
+def _request_embeddings(texts: List[str]) -> List[np.ndarray]:
+    """Embed texts via the API, splitting into concurrent requests past the per-request cap."""
+    def embed(batch: List[str]) -> List[np.ndarray]:
+        with _EMBEDDING_SLOTS:
+            response = client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=batch,
+                dimensions=EMBEDDING_DIMENSIONS
+            )
+        return [np.asarray(item.embedding, dtype=np.float32) for item in response.data]
+
+    batches = [texts[i:i + EMBEDDING_BATCH_SIZE] for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)]
+    if len(batches) == 1:
+        return embed(batches[0])
+
+    with ThreadPoolExecutor(max_workers=EMBEDDING_MAX_WORKERS) as executor:
+        return [vector for batch in executor.map(embed, batches) for vector in batch]
 
 
 def get_embeddings(texts: List[str]) -> np.ndarray:
     """
     Get OpenAI embeddings for a list of texts.
 
+    Vectors are looked up in the on-disk cache first; only misses are sent to
+    the API (in one request) and then written back. Texts that differ only in
+    case, whitespace or trailing punctuation share one cached vector, embedded
+    from the first such variant seen.
+
     Args:
         texts: List of text strings to embed
 
     Returns:
-        numpy array of shape (len(texts), EMBEDDING_DIMENSIONS)
+        float32 numpy array of shape (len(texts), EMBEDDING_DIMENSIONS)
     """
     if not texts:
-        return np.array([])
-
-    response = client.embeddings.create(
-        model=EMBEDDING_MODEL,
-        input=texts,
-        dimensions=EMBEDDING_DIMENSIONS
-    )
-
-    embeddings = [item.embedding for item in response.data]
-    return np.array(embeddings)
-
-
-def cosine_distance(a: np.ndarray, b: np.ndarray) -> float:
+        return np.array([], dtype=np.float32)
+
+    keys = [_embedding_cache_key(text) for text in texts]
+
+    with closing(_open_embedding_cache()) as conn:
+        vectors = {}
+        for start in range(0, len(keys), _SQLITE_MAX_PARAMS):
+            chunk = keys[start:start + _SQLITE_MAX_PARAMS]
+            placeholders = ','.join('?' * len(chunk))
+            for key, blob in conn.execute(f'SELECT key, vec FROM embeddings WHERE key IN ({placeholders})', chunk):
+                vectors[key] = np.frombuffer(blob, dtype=np.float32)
+
+        # Only embed texts not already cached (each distinct text once)
+        misses = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                misses.setdefault(key, text)
+
+        if misses:
+            rows = []
+            for key, vector in zip(misses, _request_embeddings(list(misses.values()))):
+                vectors[key] = vector
+                rows.append((key, vector.tobytes()))
+            conn.executemany('INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)', rows)
+            conn.commit()
+
+    # Keep the API's float32 precision: half the bytes through the matmul/pdist
+    embeddings = np.array([vectors[key] for key in keys], dtype=np.float32)
+
+    # L2-normalize rows so cosine similarity is a plain dot product downstream.
+    # Zero vectors stay zero (distance 1.0 to everything).
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.where(norms == 0, 1, norms)
+
+
+def embed_many(concept_lists: List[List[str]]) -> List[np.ndarray]:
     """
-    Compute cosine distance between two vectors.
+    Embed several concept lists with a single get_embeddings call.
 
-    Cosine distance = 1 - cosine similarity
-    Range: [0, 2] where 0 = identical, 2 = opposite
+    Args:
+        concept_lists: One list of concepts per response
+
+    Returns:
+        One embeddings array per input list, in order
     """
-    dot_product = np.dot(a, b)
-    norm_a = np.linalg.norm(a)
-    norm_b = np.linalg.norm(b)
+    embeddings = get_embeddings([concept for concepts in concept_lists for concept in concepts])
 
-    if norm_a == 0 or norm_b == 0:
-        return 1.0  # Undefined, return neutral value
+    split = []
+    offset = 0
+    for concepts in concept_lists:
+        split.append(embeddings[offset:offset + len(concepts)])
+        offset += len(concepts)
 
-    cosine_sim = dot_product / (norm_a * norm_b)
-    return 1 - cosine_sim
+    return split
 
 
-def compute_pairwise_distances(embeddings: np.ndarray) -> List[float]:
+def compute_pairwise_distances(embeddings: np.ndarray) -> np.ndarray:
     """
     Compute all pairwise cosine distances between embeddings.
 
+    Cosine distance = 1 - cosine similarity
+    Range: [0, 2] where 0 = identical, 2 = opposite
+
     Args:
-        embeddings: numpy array of shape (n, dimensions)
+        embeddings: numpy array of shape (n, dimensions), rows L2-normalized
+            (as returned by get_embeddings)
 
     Returns:
-        List of pairwise distances
+        Flat array of the n*(n-1)/2 pairwise distances (upper triangle, row-major)
     """
-    n = len(embeddings)
-    distances = []
+    if pdist is not None:
+        # SciPy's C kernel returns the condensed upper triangle directly;
+        # 0/0 from zero vectors becomes the neutral distance 1.0
+        return np.nan_to_num(pdist(embeddings, metric='cosine'), nan=1.0)
 
-    for i in range(n):
-        for j in range(i + 1, n):
-            dist = cosine_distance(embeddings[i], embeddings[j])
-            distances.append(dist)
+    similarities = embeddings @ embeddings.T
+    upper = np.triu_indices(len(embeddings), k=1)
+    return 1.0 - similarities[upper]
 
-    return distances
 
-
-def score_diversity(distances: List[float]) -> float:
+def score_diversity(distances: np.ndarray) -> float:
     """
     Convert pairwise distances to a diversity score (0-10).
 
@@ -155,17 +337,29 @@ def score_diversity(distances: List[float]) -> float:
     - Average distance > 0.5 → score 7-10 (high diversity)
 
     Args:
-        distances: List of pairwise cosine distances
+        distances: Array of pairwise cosine distances
 
     Returns:
         Diversity score from 0-10
     """
-    if not distances:
+    distances = np.asarray(distances)
+    if distances.size == 0:
         return 0.0
 
-    avg_distance = np.mean(distances)
-    std_distance = np.std(distances)
+    return _score_from_stats(*_distance_stats(distances))
+
+
+def _distance_stats(distances: np.ndarray) -> Tuple[float, float]:
+    """Mean and (population) standard deviation of the distances."""
+    d = distances.astype(np.float64, copy=False)
+    mean = d.mean()
+    # std from one pass over d: sqrt(E[d^2] - E[d]^2), clamped against rounding
+    var = max(float(np.dot(d, d)) / d.size - mean * mean, 0.0)
+    return float(mean), float(np.sqrt(var))
 
+
+def _score_from_stats(avg_distance: float, std_distance: float) -> float:
+    """Diversity score (0-10) from the distance mean and standard deviation."""
     # Map average distance to 0-10 scale
     # Empirically: average distances typically range 0.1-0.7 for text
     # 0.1 = very clustered, 0.7 = very diverse
@@ -178,7 +372,7 @@ def score_diversity(distances: List[float]) -> float:
 
     final_score = min(10, base_score + variance_bonus)
 
-    return round(final_score, 1)
+    return round(float(final_score), 1)
 
 
 def analyze_response(response_text: str) -> Dict:
@@ -191,9 +385,17 @@ def analyze_response(response_text: str) -> Dict:
     Returns:
         Dictionary with diversity metrics
     """
-    # Extract concepts
-    concepts = extract_concepts(response_text)
+    # Extract concepts, collapsing near-duplicates before they cost embeddings
+    concepts = drop_near_duplicates(extract_concepts(response_text))
+
+    # Get embeddings
+    embeddings = get_embeddings(concepts) if len(concepts) >= 2 else None
 
+    return _score_concepts(concepts, embeddings)
+
+
+def _score_concepts(concepts: List[str], embeddings: np.ndarray) -> Dict:
+    """Diversity metrics for extracted concepts and their embeddings."""
     if len(concepts) < 2:
         return {
             'diversity_score': 0.0,
@@ -204,20 +406,18 @@ def analyze_response(response_text: str) -> Dict:
             'error': 'Insufficient concepts extracted (need at least 2)'
         }
 
-    # Get embeddings
-    embeddings = get_embeddings(concepts)
-
     # Compute pairwise distances
     distances = compute_pairwise_distances(embeddings)
 
-    # Score diversity
-    diversity_score = score_diversity(distances)
+    # Score diversity (mean/std computed once, shared with the report)
+    avg_distance, std_distance = _distance_stats(distances)
+    diversity_score = _score_from_stats(avg_distance, std_distance)
 
     return {
         'diversity_score': diversity_score,
         'num_concepts': len(concepts),
-        'avg_distance': round(float(np.mean(distances)), 3),
-        'std_distance': round(float(np.std(distances)), 3),
+        'avg_distance': round(avg_distance, 3),
+        'std_distance': round(std_distance, 3),
         'min_distance': round(float(np.min(distances)), 3),
         'max_distance': round(float(np.max(distances)), 3),
         'concepts': concepts[:10],  # Show first 10 for inspection
@@ -225,24 +425,70 @@ def analyze_response(response_text: str) -> Dict:
     }
 
 
-def analyze_file(filepath: str) -> Dict:
+def analyze_file(filepath: str, content: str = None) -> Dict:
     """
     Analyze a response file and return diversity metrics.
 
+    Results are cached on disk per (path, mtime, size), so an unchanged file
+    is not re-extracted or re-embedded.
+
     Args:
         filepath: Path to markdown file containing agent response
+        content: The file's text, if the caller has already read it
 
     Returns:
         Dictionary with diversity metrics and metadata
     """
-    with open(filepath, 'r') as f:
-        content = f.read()
+    return analyze_files([filepath], None if content is None else [content])[0]
+
+
+def analyze_files(filepaths: List[str], contents: List[str] = None) -> List[Dict]:
+    """
+    Analyze several response files, embedding all of their concepts in one batch.
+
+    Prefer this over mapping analyze_file across a thread pool: the files share
+    one embeddings round-trip instead of one each. It is also safe to call from
+    several threads; in-flight API requests stay capped process-wide.
+
+    Args:
+        filepaths: Paths to markdown files containing agent responses
+        contents: The files' text, parallel to filepaths, if already read
+
+    Returns:
+        List of diversity results, in the same order as filepaths
+    """
+    keys = [_file_result_key(filepath) for filepath in filepaths]
+    cached = _load_file_results(keys)
+
+    # Only files that changed since their last analysis go through the pipeline
+    pending = {}
+    for i, (filepath, key) in enumerate(zip(filepaths, keys)):
+        if key not in cached and key not in pending:
+            if contents is not None:
+                text = contents[i]
+            else:
+                with open(filepath, 'r', encoding='utf-8', buffering=1 << 20) as f:
+                    text = f.read()
+            pending[key] = drop_near_duplicates(extract_concepts(text))
+
+    if pending:
+        # Responses with <2 concepts are not scored, so don't embed them
+        embedded = embed_many([concepts if len(concepts) >= 2 else [] for concepts in pending.values()])
+        fresh = {
+            key: _score_concepts(concepts, embeddings)
+            for (key, concepts), embeddings in zip(pending.items(), embedded)
+        }
+        _store_file_results(fresh)
+        cached.update(fresh)
 
-    result = analyze_response(content)
-    result['filepath'] = filepath
-    result['filename'] = os.path.basename(filepath)
+    results = []
+    for filepath, key in zip(filepaths, keys):
+        result = json.loads(json.dumps(cached[key]))  # independent copy per caller
+        result['filepath'] = filepath
+        result['filename'] = os.path.basename(filepath)
+        results.append(result)
 
-    return result
+    return results
 
 
 def compare_responses(baseline_file: str, improved_file: str) -> Dict:
@@ -256,8 +502,8 @@ def compare_responses(baseline_file: str, improved_file: str) -> Dict:
     Returns:
         Comparison metrics
     """
-    baseline = analyze_file(baseline_file)
-    improved = analyze_file(improved_file)
+    # One embeddings round-trip for both responses
+    baseline, improved = analyze_files([baseline_file, improved_file])
 
     improvement = improved['diversity_score'] - baseline['diversity_score']
     improvement_pct = (improvement / baseline['diversity_score'] * 100) if baseline['diversity_score'] > 0 else 0
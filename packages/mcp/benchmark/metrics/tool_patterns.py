@@ -26,6 +26,16 @@ import json
 from typing import List, Dict, Set, Tuple
 from collections import Counter
 
+try:
+    import orjson  # Faster log parsing when available
+except ImportError:
+    orjson = None
+
+try:
+    import hyperscan  # Block-mode multi-literal DFA for batch text scans
+except ImportError:
+    hyperscan = None
+
 # Interlens tool inventory
 BASIC_TOOLS = {
     'search_lenses': ['search', 'searching for', 'searched for'],
@@ -42,6 +52,10 @@ CREATIVE_TOOLS = {
     'random_lens_provocation': ['random lens', 'provocation', 'random provocation'],
 }
 
+# Tool-name sets for membership checks
+_BASIC_KEYS = frozenset(BASIC_TOOLS)
+_CREATIVE_KEYS = frozenset(CREATIVE_TOOLS)
+
 # Effective tool sequences (patterns that indicate strategic exploration)
 EFFECTIVE_SEQUENCES = [
     ['search_lenses', 'find_lens_journey'],      # Search → explore path
@@ -51,6 +65,11 @@ EFFECTIVE_SEQUENCES = [
     ['random_lens_provocation', 'get_related_lenses'], # Random → explore connections
 ]
 
+# Adjacent (tool, next_tool) pair → sequence label, for one lookup per pair
+_SEQUENCE_LOOKUP = {
+    (seq[0], seq[1]): f"{seq[0]} → {seq[1]}" for seq in EFFECTIVE_SEQUENCES if len(seq) >= 2
+}
+
 # Anti-patterns (ineffective usage)
 ANTI_PATTERNS = [
     'repeated_search',  # Same search multiple times
@@ -58,6 +77,43 @@ ANTI_PATTERNS = [
     'random_only',      # Only using random without integration
 ]
 
+# Phrases that indicate a tool was used in free-text responses, in report order
+TEXT_TOOL_PHRASES = {
+    'search_lenses': ['i searched', 'searching for', 'i\'ll search'],
+    'find_lens_journey': ['journey from', 'journey between', 'path from', 'conceptual path'],
+    'find_bridge_lenses': ['bridge between', 'bridging', 'bridge lens'],
+    'find_contrasting_lenses': ['contrasting lens', 'paradox', 'opposing lens', 'tension between'],
+    'get_central_lenses': ['central lens', 'most central', 'hub', 'betweenness'],
+    'get_lens_neighborhood': ['neighborhood', 'nearby lens', 'surrounding lens'],
+    'random_lens_provocation': ['random lens', 'random provocation'],
+}
+
+_PHRASE_TO_TOOL = {
+    phrase: tool for tool, phrases in TEXT_TOOL_PHRASES.items() for phrase in phrases
+}
+# One pass over the text finds every phrase; the zero-width lookahead lets
+# matches overlap, so no phrase is hidden by another one sharing characters
+_TEXT_TOOL_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(p) for p in sorted(_PHRASE_TO_TOOL, key=len, reverse=True)) + '))'
+)
+
+
+def _compile_tool_phrase_db():
+    """Compile all tool phrases into one Hyperscan block-mode database."""
+    tools = list(_PHRASE_TO_TOOL.values())
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    db.compile(
+        expressions=[re.escape(phrase).encode('utf-8') for phrase in _PHRASE_TO_TOOL],
+        ids=list(range(len(tools))),
+        # Report each phrase once; the text is lowered first, so no CASELESS
+        flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(tools),
+    )
+    return db, tools
+
+
+if hyperscan is not None:
+    _TOOL_PHRASE_DB, _TOOL_PHRASE_IDS = _compile_tool_phrase_db()
+
 
 def extract_tool_calls_from_text(text: str) -> List[str]:
     """
@@ -72,40 +128,19 @@ def extract_tool_calls_from_text(text: str) -> List[str]:
     Returns:
         List of tool names (in order of usage)
     """
-    tools_used = []
-
-    # Normalize text
     normalized = text.lower()
 
-    # Pattern: "I searched for X" → search_lenses
-    if any(p in normalized for p in ['i searched', 'searching for', 'i\'ll search']):
-        tools_used.append('search_lenses')
+    if hyperscan is not None:
+        found = set()
 
-    # Pattern: "journey from X to Y" → find_lens_journey
-    if any(p in normalized for p in ['journey from', 'journey between', 'path from', 'conceptual path']):
-        tools_used.append('find_lens_journey')
+        def on_match(phrase_id, start, end, flags, context):
+            found.add(_TOOL_PHRASE_IDS[phrase_id])
 
-    # Pattern: "bridge between X and Y" → find_bridge_lenses
-    if any(p in normalized for p in ['bridge between', 'bridging', 'bridge lens']):
-        tools_used.append('find_bridge_lenses')
-
-    # Pattern: "contrasting lenses" → find_contrasting_lenses
-    if any(p in normalized for p in ['contrasting lens', 'paradox', 'opposing lens', 'tension between']):
-        tools_used.append('find_contrasting_lenses')
-
-    # Pattern: "central lenses" or "hubs" → get_central_lenses
-    if any(p in normalized for p in ['central lens', 'most central', 'hub', 'betweenness']):
-        tools_used.append('get_central_lenses')
-
-    # Pattern: "neighborhood" → get_lens_neighborhood
-    if any(p in normalized for p in ['neighborhood', 'nearby lens', 'surrounding lens']):
-        tools_used.append('get_lens_neighborhood')
-
-    # Pattern: "random lens" → random_lens_provocation
-    if any(p in normalized for p in ['random lens', 'random provocation']):
-        tools_used.append('random_lens_provocation')
+        _TOOL_PHRASE_DB.scan(normalized.encode('utf-8'), match_event_handler=on_match)
+    else:
+        found = {_PHRASE_TO_TOOL[m.group(1)] for m in _TEXT_TOOL_RE.finditer(normalized)}
 
-    return tools_used
+    return [tool for tool in TEXT_TOOL_PHRASES if tool in found]
 
 
 def extract_tool_calls_from_log(log_file: str) -> List[Dict]:
@@ -127,11 +162,14 @@ def extract_tool_calls_from_log(log_file: str) -> List[Dict]:
     if not os.path.exists(log_file):
         return []
 
-    with open(log_file, 'r') as f:
-        try:
-            log_data = json.load(f)
-        except json.JSONDecodeError:
-            return []
+    with open(log_file, 'rb', buffering=1 << 20) as f:
+        raw = f.read()
+
+    try:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        log_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except json.JSONDecodeError:
+        return []
 
     tool_calls = []
 
@@ -157,9 +195,9 @@ def categorize_tools(tool_names: List[str]) -> Dict[str, List[str]]:
     categorized = {'basic': [], 'creative': []}
 
     for tool in tool_names:
-        if tool in BASIC_TOOLS:
+        if tool in _BASIC_KEYS:
             categorized['basic'].append(tool)
-        elif tool in CREATIVE_TOOLS:
+        elif tool in _CREATIVE_KEYS:
             categorized['creative'].append(tool)
 
     return categorized
@@ -174,21 +212,22 @@ def detect_sequences(tool_names: List[str]) -> List[Tuple[str, str]]:
     """
     detected = []
 
-    for i in range(len(tool_names) - 1):
-        current = tool_names[i]
-        next_tool = tool_names[i + 1]
-
-        for seq in EFFECTIVE_SEQUENCES:
-            if len(seq) >= 2 and current == seq[0] and next_tool == seq[1]:
-                detected.append((f"{seq[0]} → {seq[1]}", [current, next_tool]))
+    for current, next_tool in zip(tool_names, tool_names[1:]):
+        name = _SEQUENCE_LOOKUP.get((current, next_tool))
+        if name:
+            detected.append((name, [current, next_tool]))
 
     return detected
 
 
-def detect_anti_patterns(tool_names: List[str]) -> List[str]:
+def detect_anti_patterns(tool_names: List[str], unique: Set[str] = None) -> List[str]:
     """
     Detect anti-patterns in tool usage.
 
+    Args:
+        tool_names: Tool names in order of use
+        unique: set(tool_names), if the caller already has it
+
     Returns:
         List of anti-pattern names detected
     """
@@ -201,9 +240,12 @@ def detect_anti_patterns(tool_names: List[str]) -> List[str]:
                 anti.append('repeated_search')
                 break
 
+    if unique is None:
+        unique = set(tool_names)
+
     # No followup (search without any exploration)
-    has_search = 'search_lenses' in tool_names
-    has_exploration = any(t in CREATIVE_TOOLS for t in tool_names)
+    has_search = 'search_lenses' in unique
+    has_exploration = bool(unique & _CREATIVE_KEYS)
     if has_search and not has_exploration and len(tool_names) <= 2:
         anti.append('no_followup')
 
@@ -220,7 +262,8 @@ def calculate_tool_score(
     tool_names: List[str],
     categorized: Dict[str, List[str]],
     sequences: List[Tuple],
-    anti_patterns: List[str]
+    anti_patterns: List[str],
+    unique: Set[str] = None
 ) -> Tuple[float, Dict]:
     """
     Calculate overall tool usage score (0-10).
@@ -231,11 +274,14 @@ def calculate_tool_score(
     - Bonus: Effective sequences (0-3 points)
     - Penalty: Anti-patterns (-1 point each)
 
+    Args:
+        unique: set(tool_names), if the caller already has it
+
     Returns:
         Tuple of (score, breakdown_dict)
     """
     # Base score: diversity
-    unique_tools = len(set(tool_names))
+    unique_tools = len(unique if unique is not None else set(tool_names))
     diversity_score = min(4.0, unique_tools * 0.8)  # Up to 4 points
 
     # Creative tool bonus
@@ -289,9 +335,10 @@ def analyze_response_text(text: str) -> Dict:
 
     categorized = categorize_tools(tool_calls)
     sequences = detect_sequences(tool_calls)
-    anti = detect_anti_patterns(tool_calls)
+    unique = set(tool_calls)
+    anti = detect_anti_patterns(tool_calls, unique)
 
-    score, breakdown = calculate_tool_score(tool_calls, categorized, sequences, anti)
+    score, breakdown = calculate_tool_score(tool_calls, categorized, sequences, anti, unique)
 
     return {
         'tool_score': score,
@@ -328,9 +375,10 @@ def analyze_log_file(log_file: str) -> Dict:
 
     categorized = categorize_tools(tool_names)
     sequences = detect_sequences(tool_names)
-    anti = detect_anti_patterns(tool_names)
+    unique = set(tool_names)
+    anti = detect_anti_patterns(tool_names, unique)
 
-    score, breakdown = calculate_tool_score(tool_names, categorized, sequences, anti)
+    score, breakdown = calculate_tool_score(tool_names, categorized, sequences, anti, unique)
 
     return {
         'tool_score': score,
@@ -344,12 +392,13 @@ def analyze_log_file(log_file: str) -> Dict:
     }
 
 
-def analyze_file(filepath: str) -> Dict:
+def analyze_file(filepath: str, content: str = None) -> Dict:
     """
     Analyze tool usage from either response text (.md) or log file (.json).
 
     Args:
         filepath: Path to response markdown or conversation log JSON
+        content: The markdown file's text, if the caller has already read it
 
     Returns:
         Dictionary with tool usage metrics
@@ -360,8 +409,9 @@ def analyze_file(filepath: str) -> Dict:
         result = analyze_log_file(filepath)
     else:
         # Assume markdown response file
-        with open(filepath, 'r') as f:
-            content = f.read()
+        if content is None:
+            with open(filepath, 'r', encoding='utf-8', buffering=1 << 20) as f:
+                content = f.read()
         result = analyze_response_text(content)
 
     result['filepath'] = filepath
@@ -416,7 +466,7 @@ def print_report(result: Dict):
 
     print(f"\n🔧 Tools Used:")
     for tool in result['tools_used']:
-        category = "🎨" if tool in CREATIVE_TOOLS else "📝"
+        category = "🎨" if tool in _CREATIVE_KEYS else "📝"
         print(f"   {category} {tool}")
 
     if result.get('sequences'):
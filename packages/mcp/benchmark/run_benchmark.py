@@ -14,36 +14,249 @@ Usage:
 """
 
 import os
+import re
 import sys
 import json
+import asyncio
+import hashlib
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 import random
 
+import numpy as np
+
+try:
+    import orjson  # Faster result serialization when available
+except ImportError:
+    orjson = None
+
 # Add metrics directory to path
 sys.path.insert(0, str(Path(__file__).parent / 'metrics'))
 
 from semantic_diversity import analyze_file as analyze_diversity
 from frame_coverage import analyze_file as analyze_coverage
 from tool_patterns import analyze_file as analyze_tools
-from quality_scorer import analyze_file as analyze_quality
+from quality_scorer import analyze_file_async as analyze_quality_async
+from quality_scorer import evaluate_response_delta_async, load_problem_file, resolve_problem_file
+from quality_scorer import MODEL as JUDGE_MODEL, RUBRIC_VERSION
+
+# Judge calls are network-bound; this many run at once across a batch
+MAX_CONCURRENT_JUDGE_CALLS = 10
+
+# Judge verdicts for unchanged response files, reused across runs (--use-judge-cache)
+JUDGE_CACHE_DIR = Path(__file__).parent / '.judge_cache'
+
+
+def write_json(path: Path, data) -> None:
+    """Write data to path as indented JSON, through orjson when it is installed."""
+    if orjson is not None:
+        Path(path).write_bytes(orjson.dumps(
+            data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+def cache_key(response_file: Path) -> str:
+    """
+    Key a judge verdict on everything it depends on: rubric version, judge
+    model, the resolved problem file (path and bytes) and the response bytes.
+    """
+    problem_file = resolve_problem_file(str(response_file))
+    digest = hashlib.sha256(f"{RUBRIC_VERSION}|{JUDGE_MODEL}|{problem_file}|".encode('utf-8'))
+    if problem_file is not None:
+        digest.update(hashlib.sha256(Path(problem_file).read_bytes()).digest())
+    digest.update(Path(response_file).read_bytes())
+    return digest.hexdigest()
+
+
+def get_cached_grade(key: str) -> Optional[Dict]:
+    """Return the cached judge verdict for key, or None on a miss."""
+    try:
+        return json.loads((JUDGE_CACHE_DIR / f'{key}.json').read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_cached_grade(key: str, grade: Dict):
+    """Store a judge verdict (written atomically, so concurrent runs never see half a file)."""
+    JUDGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = JUDGE_CACHE_DIR / f'{key}.{os.getpid()}.tmp'
+    tmp_path.write_text(json.dumps(grade))
+    os.replace(tmp_path, JUDGE_CACHE_DIR / f'{key}.json')
+
+
+# Incremental judging (--incremental-judge): per-file record of the last judged
+# content, as paragraph hashes, plus its verdict
+JUDGE_SESSION_DIR = JUDGE_CACHE_DIR / 'sessions'
+
+# Largest share of paragraphs that may be new for a delta evaluation; bigger
+# edits get a full re-evaluation
+INCREMENTAL_THRESHOLD = 0.2
+
+# Delta verdicts chained on one file before a full re-evaluation, so judge
+# drift across successive partial re-scores stays bounded
+MAX_CHAINED_DELTAS = 3
+
+
+def _session_path(response_file: Path) -> Path:
+    name = hashlib.sha256(str(Path(response_file).resolve()).encode('utf-8')).hexdigest()
+    return JUDGE_SESSION_DIR / f'{name}.json'
+
+
+_BLANK_LINE_RE = re.compile(r'\n[ \t]*\n')
+
+
+def split_blocks(text: str) -> List[str]:
+    """Split markdown into non-empty paragraph blocks (surrounding whitespace ignored)."""
+    return [block.strip() for block in _BLANK_LINE_RE.split(text) if block.strip()]
+
+
+def hash_blocks(blocks: List[str]) -> List[str]:
+    """Content hash of each block, in order."""
+    return [hashlib.sha256(block.encode('utf-8')).hexdigest() for block in blocks]
+
+
+def _problem_mtime(problem_file: Optional[str]) -> Optional[int]:
+    try:
+        return os.stat(problem_file).st_mtime_ns
+    except (TypeError, OSError):
+        return None
+
+
+def load_judge_session(response_file: Path) -> Optional[Dict]:
+    """
+    Last judged state of response_file, if a delta may build on it.
+
+    That requires the current rubric and model, the same problem file,
+    unmodified since, and fewer than MAX_CHAINED_DELTAS deltas in a row.
+    """
+    try:
+        session = json.loads(_session_path(response_file).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if session.get('rubric_version') != RUBRIC_VERSION or session.get('model') != JUDGE_MODEL:
+        return None
+    if session.get('deltas', 0) >= MAX_CHAINED_DELTAS:
+        return None
+    problem_file = resolve_problem_file(str(response_file))
+    if (problem_file is None or session.get('problem_file') != problem_file
+            or session.get('problem_mtime') != _problem_mtime(problem_file)):
+        return None
+    return session
+
+
+def save_judge_session(response_file: Path, block_hashes: List[str], verdict: Dict, deltas: int = 0):
+    """Record the judged content and verdict for the next incremental run."""
+    JUDGE_SESSION_DIR.mkdir(parents=True, exist_ok=True)
+    path = _session_path(response_file)
+    tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+    tmp_path.write_text(json.dumps({
+        'rubric_version': RUBRIC_VERSION,
+        'model': JUDGE_MODEL,
+        'problem_file': verdict.get('problem_file'),
+        'problem_mtime': _problem_mtime(verdict.get('problem_file')),
+        'deltas': deltas,
+        'blocks': block_hashes,
+        'verdict': verdict,
+    }))
+    os.replace(tmp_path, path)
+
+
+def appended_delta(blocks: List[str], block_hashes: List[str], session: Optional[Dict]) -> Optional[str]:
+    """
+    Text appended since the session's judged content, or None if a full evaluation is needed.
+
+    A delta applies only when the previously judged blocks are an unchanged
+    prefix of the current ones, i.e. everything new is a contiguous tail, and
+    at most INCREMENTAL_THRESHOLD of the blocks are new.
+    """
+    if not session:
+        return None
+
+    previous = session['blocks']
+    if len(block_hashes) <= len(previous) or block_hashes[:len(previous)] != previous:
+        return None
+
+    overlap = len(previous) / len(block_hashes)
+    if overlap < 1 - INCREMENTAL_THRESHOLD:
+        return None
+
+    return '\n\n'.join(blocks[len(previous):])
+
+
+def _score_stats(scores: np.ndarray) -> Dict:
+    """Average (2 dp), min and max of a metric's scores; zeros when there are none."""
+    if not scores.size:
+        return {'average': 0, 'min': 0, 'max': 0}
+    return {
+        'average': round(float(scores.mean()), 2),
+        'min': float(scores.min()),
+        'max': float(scores.max()),
+    }
+
+
+# Wildcards that rule out the single-scan suffix match in find_response_files
+_GLOB_CHARS_RE = re.compile(r'[*?\[/]')
 
 
 class BenchmarkRunner:
     """Orchestrates benchmark evaluation."""
 
-    def __init__(self, results_dir: str, use_llm_judge: bool = True):
+    def __init__(self, results_dir: str, use_llm_judge: bool = True,
+                 max_concurrent_llm: int = MAX_CONCURRENT_JUDGE_CALLS,
+                 use_judge_cache: bool = False, incremental_judge: bool = False):
         self.results_dir = Path(results_dir)
         self.use_llm_judge = use_llm_judge
+        self.max_concurrent_llm = max_concurrent_llm
+        self.use_judge_cache = use_judge_cache
+        self.incremental_judge = incremental_judge
         self.results = []
 
+    def _iter_response_files(self, pattern: str):
+        """Yield paths in results_dir matching the glob pattern."""
+        suffix = pattern[1:]
+        if not pattern.startswith('*') or _GLOB_CHARS_RE.search(suffix):
+            yield from self.results_dir.glob(pattern)
+            return
+
+        # A plain "*<suffix>" pattern is answered from one directory scan;
+        # DirEntry caches the file type from the scan, so no per-file stat
+        with os.scandir(self.results_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(suffix) and entry.is_file():
+                    yield Path(entry.path)
+
     def find_response_files(self, pattern: str = "*.md") -> List[Path]:
         """Find all response files matching pattern."""
-        return sorted(self.results_dir.glob(pattern))
-
-    def evaluate_single_response(self, response_file: Path) -> Dict:
-        """Run all metrics on a single response file."""
+        return sorted(self._iter_response_files(pattern))
+
+    def sample_response_files(self, k: int, pattern: str = "*.md") -> List[Path]:
+        """
+        Pick up to k response files uniformly at random, in no particular order.
+
+        Reservoir sampling over the directory listing keeps only the sampled
+        paths in memory rather than the full sorted list.
+        """
+        reservoir = []
+        for i, response_file in enumerate(self._iter_response_files(pattern)):
+            if i < k:
+                reservoir.append(response_file)
+            else:
+                j = random.randrange(i + 1)
+                if j < k:
+                    reservoir[j] = response_file
+        return reservoir
+
+    def _evaluate_tier1(self, response_file: Path) -> Dict:
+        """
+        Run the automated (Tier 1) metrics on a single response file.
+
+        The file is read once and the three metrics score it side by side;
+        each metric module is still only used by one thread at a time.
+        """
         print(f"Evaluating: {response_file.name}...")
 
         result = {
@@ -51,36 +264,135 @@ class BenchmarkRunner:
             'filename': response_file.name,
         }
 
-        # Tier 1: Semantic Diversity
+        filepath = str(response_file)
         try:
-            diversity = analyze_diversity(str(response_file))
-            result['diversity'] = diversity
+            content = response_file.read_text(encoding='utf-8')
         except Exception as e:
-            result['diversity'] = {'error': str(e)}
+            # Unreadable file: every metric fails on it, as when each read it itself
+            for metric in ('diversity', 'coverage', 'tools'):
+                result[metric] = {'error': str(e)}
+            return result
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                'diversity': executor.submit(analyze_diversity, filepath, content),       # Tier 1: Semantic Diversity
+                'coverage': executor.submit(analyze_coverage, filepath, None, content),   # Tier 1: Frame Coverage
+                'tools': executor.submit(analyze_tools, filepath, content),               # Tier 1: Tool Patterns
+            }
+            for metric, future in futures.items():
+                try:
+                    result[metric] = future.result()
+                except Exception as e:
+                    result[metric] = {'error': str(e)}
 
-        # Tier 1: Frame Coverage
-        try:
-            coverage = analyze_coverage(str(response_file))
-            result['coverage'] = coverage
-        except Exception as e:
-            result['coverage'] = {'error': str(e)}
+        return result
 
-        # Tier 1: Tool Patterns
+    async def _evaluate_quality(self, response_file: Path, semaphore: asyncio.Semaphore = None) -> Dict:
+        """Tier 2: Quality (LLM-as-judge), holding a semaphore slot if given."""
         try:
-            tools = analyze_tools(str(response_file))
-            result['tools'] = tools
+            if self.use_judge_cache:
+                key = cache_key(response_file)
+                cached = get_cached_grade(key)
+                if cached is not None:
+                    cached['response_file'] = str(response_file)
+                    return cached
+
+            delta = session = None
+            if self.incremental_judge:
+                blocks = split_blocks(response_file.read_text(encoding='utf-8'))
+                block_hashes = hash_blocks(blocks)
+                session = load_judge_session(response_file)
+                delta = appended_delta(blocks, block_hashes, session)
+
+            if semaphore is None:
+                quality = await self._judge(response_file, delta, session)
+            else:
+                async with semaphore:
+                    quality = await self._judge(response_file, delta, session)
+
+            # Failed judge calls are retried next run rather than cached
+            if 'error' not in quality:
+                if self.use_judge_cache:
+                    save_cached_grade(key, quality)
+                if self.incremental_judge:
+                    deltas = session.get('deltas', 0) + 1 if delta is not None else 0
+                    save_judge_session(response_file, block_hashes, quality, deltas)
+
+            return quality
         except Exception as e:
-            result['tools'] = {'error': str(e)}
+            return {'error': str(e)}
+
+    async def _judge(self, response_file: Path, delta: Optional[str], session: Optional[Dict]) -> Dict:
+        """Full judge evaluation, or a delta re-score when only a tail was appended."""
+        if delta is None:
+            return await analyze_quality_async(str(response_file))
+
+        problem_file = session['problem_file']
+        quality = await evaluate_response_delta_async(
+            session['verdict'], delta, load_problem_file(problem_file))
+        quality['response_file'] = str(response_file)
+        quality['problem_file'] = problem_file
+        quality['incremental'] = True
+        return quality
+
+    async def evaluate_single_response_async(
+        self,
+        response_file: Path,
+        semaphore: asyncio.Semaphore = None,
+        tier1_executor: ThreadPoolExecutor = None
+    ) -> Dict:
+        """
+        Run all metrics on a single response file.
+
+        Tier 1 runs on a worker thread while the judge call is awaited, so a
+        file costs roughly the slower of the two rather than their sum.
+        """
+        loop = asyncio.get_running_loop()
+        tier1 = loop.run_in_executor(tier1_executor, self._evaluate_tier1, response_file)
+
+        if not self.use_llm_judge:
+            return await tier1
+
+        result, quality = await asyncio.gather(tier1, self._evaluate_quality(response_file, semaphore))
+        result['quality'] = quality
+        return result
 
-        # Tier 2: Quality (LLM-as-judge)
-        if self.use_llm_judge:
-            try:
-                quality = analyze_quality(str(response_file))
-                result['quality'] = quality
-            except Exception as e:
-                result['quality'] = {'error': str(e)}
+    def evaluate_single_response(self, response_file: Path) -> Dict:
+        """Run all metrics on a single response file."""
+        return asyncio.run(self.evaluate_single_response_async(response_file))
+
+    async def evaluate_responses_async(self, response_files: List[Path]) -> List[Dict]:
+        """
+        Evaluate response files concurrently, returning results in input order.
+
+        Up to max_concurrent_llm judge calls are in flight at once. Tier 1
+        metrics keep module-level caches, so they run one file at a time on a
+        single worker thread, overlapping with the judge calls.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_llm)
+        with ThreadPoolExecutor(max_workers=1) as tier1_executor:
+            outcomes = await asyncio.gather(*(
+                self.evaluate_single_response_async(response_file, semaphore, tier1_executor)
+                for response_file in response_files
+            ), return_exceptions=True)
+
+        # A file that failed outright gets error entries instead of sinking the batch
+        results = []
+        for response_file, outcome in zip(response_files, outcomes):
+            if isinstance(outcome, Exception):
+                outcome = {
+                    'file': str(response_file),
+                    'filename': response_file.name,
+                    'diversity': {'error': str(outcome)},
+                    'coverage': {'error': str(outcome)},
+                    'tools': {'error': str(outcome)},
+                }
+            results.append(outcome)
+        return results
 
-        return result
+    def evaluate_responses(self, response_files: List[Path]) -> List[Dict]:
+        """Evaluate the given response files (see evaluate_responses_async)."""
+        return asyncio.run(self.evaluate_responses_async(response_files))
 
     def evaluate_all_responses(self) -> List[Dict]:
         """Evaluate all response files in results directory."""
@@ -89,53 +401,32 @@ class BenchmarkRunner:
         print(f"\nFound {len(response_files)} response files in {self.results_dir}")
         print("="*60)
 
-        results = []
-        for response_file in response_files:
-            result = self.evaluate_single_response(response_file)
-            results.append(result)
-
-        return results
+        return self.evaluate_responses(response_files)
 
     def generate_summary_report(self, results: List[Dict]) -> Dict:
         """Generate aggregate statistics across all results."""
         if not results:
             return {'error': 'No results to summarize'}
 
-        # Aggregate scores
-        diversity_scores = [r['diversity'].get('diversity_score', 0) for r in results if 'diversity' in r]
-        coverage_scores = [r['coverage'].get('coverage_score', 0) for r in results if 'coverage' in r]
-        tool_scores = [r['tools'].get('tool_score', 0) for r in results if 'tools' in r]
-        quality_scores = [r['quality']['scores'].get('average', 0) for r in results if 'quality' in r and 'scores' in r['quality']]
+        # Aggregate scores (one array per metric; reductions run in NumPy)
+        diversity_scores = np.fromiter((r['diversity'].get('diversity_score', 0) for r in results if 'diversity' in r), dtype=np.float64)
+        coverage_scores = np.fromiter((r['coverage'].get('coverage_score', 0) for r in results if 'coverage' in r), dtype=np.float64)
+        tool_scores = np.fromiter((r['tools'].get('tool_score', 0) for r in results if 'tools' in r), dtype=np.float64)
+        quality_scores = np.fromiter((r['quality']['scores'].get('average', 0) for r in results if 'quality' in r and 'scores' in r['quality']), dtype=np.float64)
 
         summary = {
             'total_responses': len(results),
-            'diversity': {
-                'average': round(sum(diversity_scores) / len(diversity_scores), 2) if diversity_scores else 0,
-                'min': min(diversity_scores) if diversity_scores else 0,
-                'max': max(diversity_scores) if diversity_scores else 0,
-            },
-            'coverage': {
-                'average': round(sum(coverage_scores) / len(coverage_scores), 2) if coverage_scores else 0,
-                'min': min(coverage_scores) if coverage_scores else 0,
-                'max': max(coverage_scores) if coverage_scores else 0,
-            },
-            'tools': {
-                'average': round(sum(tool_scores) / len(tool_scores), 2) if tool_scores else 0,
-                'min': min(tool_scores) if tool_scores else 0,
-                'max': max(tool_scores) if tool_scores else 0,
-            },
+            'diversity': _score_stats(diversity_scores),
+            'coverage': _score_stats(coverage_scores),
+            'tools': _score_stats(tool_scores),
         }
 
-        if quality_scores:
-            summary['quality'] = {
-                'average': round(sum(quality_scores) / len(quality_scores), 2),
-                'min': min(quality_scores),
-                'max': max(quality_scores),
-            }
+        if quality_scores.size:
+            summary['quality'] = _score_stats(quality_scores)
 
         # Overall benchmark score (average of all metrics)
-        all_scores = diversity_scores + coverage_scores + tool_scores + (quality_scores if quality_scores else [])
-        summary['overall_score'] = round(sum(all_scores) / len(all_scores), 2) if all_scores else 0
+        all_scores = np.concatenate([diversity_scores, coverage_scores, tool_scores, quality_scores])
+        summary['overall_score'] = round(float(all_scores.mean()), 2) if all_scores.size else 0
 
         return summary
 
@@ -163,16 +454,16 @@ class BenchmarkRunner:
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'w') as f:
-            json.dump({
-                'results': results,
-                'summary': self.generate_summary_report(results)
-            }, f, indent=2)
+        write_json(output_path, {
+            'results': results,
+            'summary': self.generate_summary_report(results)
+        })
 
         print(f"✅ Results saved to: {output_file}")
 
 
-def compare_conditions(baseline_dir: str, improved_dir: str, use_llm_judge: bool = True) -> Dict:
+def compare_conditions(baseline_dir: str, improved_dir: str, use_llm_judge: bool = True,
+                       use_judge_cache: bool = False, incremental_judge: bool = False) -> Dict:
     """
     Compare two conditions (e.g., baseline vs with-interlens).
 
@@ -196,15 +487,21 @@ def compare_conditions(baseline_dir: str, improved_dir: str, use_llm_judge: bool
 
     comparisons = []
 
-    for filename in sorted(matching):
+    baseline_runner = BenchmarkRunner(baseline_path, use_llm_judge, use_judge_cache=use_judge_cache,
+                                      incremental_judge=incremental_judge)
+    improved_runner = BenchmarkRunner(improved_path, use_llm_judge, use_judge_cache=use_judge_cache,
+                                      incremental_judge=incremental_judge)
+    matching_sorted = sorted(matching)
+
+    for filename in matching_sorted:
         print(f"\n{filename}:")
 
         baseline_file = baseline_files[filename]
         improved_file = improved_files[filename]
 
         # Run metrics on both
-        baseline_result = BenchmarkRunner(baseline_path, use_llm_judge).evaluate_single_response(baseline_file)
-        improved_result = BenchmarkRunner(improved_path, use_llm_judge).evaluate_single_response(improved_file)
+        baseline_result = baseline_runner.evaluate_single_response(baseline_file)
+        improved_result = improved_runner.evaluate_single_response(improved_file)
 
         # Calculate improvements
         comparison = {
@@ -295,6 +592,10 @@ def main():
                         help='Evaluate random sample of N files')
     parser.add_argument('--no-llm-judge', action='store_true',
                         help='Skip LLM-as-judge evaluation (Tier 2)')
+    parser.add_argument('--use-judge-cache', action='store_true',
+                        help='Reuse cached LLM-judge verdicts for unchanged response files')
+    parser.add_argument('--incremental-judge', action='store_true',
+                        help='Re-score only appended text when a response was extended since its last run')
     parser.add_argument('--output', default='benchmark/results/report.json',
                         help='Output file for results JSON')
 
@@ -305,23 +606,22 @@ def main():
     if args.compare:
         # Comparison mode
         baseline_dir, improved_dir = args.compare
-        comparison = compare_conditions(baseline_dir, improved_dir, use_llm_judge)
+        comparison = compare_conditions(baseline_dir, improved_dir, use_llm_judge,
+                                        args.use_judge_cache, args.incremental_judge)
 
         # Save comparison results
         if args.output:
-            with open(args.output, 'w') as f:
-                json.dump(comparison, f, indent=2)
+            write_json(args.output, comparison)
             print(f"✅ Comparison saved to: {args.output}")
 
     elif args.results:
         # Single directory evaluation
-        runner = BenchmarkRunner(args.results, use_llm_judge)
+        runner = BenchmarkRunner(args.results, use_llm_judge, use_judge_cache=args.use_judge_cache,
+                                 incremental_judge=args.incremental_judge)
 
         if args.sample:
             # Random sample
-            all_files = runner.find_response_files()
-            sampled = random.sample(list(all_files), min(args.sample, len(all_files)))
-            results = [runner.evaluate_single_response(f) for f in sampled]
+            results = runner.evaluate_responses(runner.sample_response_files(args.sample))
         else:
             # All files
             results = runner.evaluate_all_responses()
@@ -0,0 +1,26 @@
+"""Tests for benchmark problem-file parsing."""
+
+import sys
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def quality_scorer(project_root):
+    pytest.importorskip("anthropic")
+    sys.path.insert(0, str(project_root / "packages" / "mcp" / "benchmark" / "metrics"))
+    import quality_scorer
+    return quality_scorer
+
+
+def test_subsections_stay_in_their_section(quality_scorer, project_root):
+    """### subsections are part of the enclosing ## section, not new sections."""
+    path = project_root / "tests" / "structural" / "fixtures" / "problem_with_subsections.md"
+    sections = quality_scorer.load_problem_file(str(path))
+
+    assert "### Traffic" in sections["context"]
+    assert sections["context"].endswith("Peaks at 2,000 requests per minute.")
+    assert sections["challenge"] == "Checkout latency regressed after the last release."
+    assert "### Why it falls short" in sections["baseline"]
+    assert sections["target"] == "Reframe the checkout as an asynchronous workflow."
+    assert sections["prompt"] == "Why is checkout slow, and what should the team do next?"